@@ -1,10 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.services.product_service import ProductService
-from app.models.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional, Union
+from app.config.settings import settings
+from app.core.change_stream import change_broadcaster, format_sse, format_ws
+from app.core.database import get_async_db, get_async_read_db, get_db, get_read_db
+from app.services.product_service import ProductService, product_cache
+from app.services.async_product_service import AsyncProductService
+from app.services.export_service import EXPORT_MEDIA_TYPES, stream_product_export
+from app.services.import_service import (
+    IMPORT_FORMATS,
+    create_import_job,
+    detect_import_format,
+    get_import_errors,
+    get_import_job,
+    run_import_job
+)
+from app.models.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductBulkUpdate,
+    ProductBulkDelete,
+    ProductResponse,
+    ProductListResponse,
+    BulkOperationResponse,
+    StockAdjustment,
+    ProductStockAdjustment,
+    StockAdjustmentResponse,
+    ImportJobResponse,
+    ImportErrorReport,
+    ProductChangesResponse
+)
+from app.utils.fast_json import FastJSONResponse
+from app.utils.http_cache import http_date, is_not_modified, make_etag, matches_any
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from uuid import UUID
+import inspect
+
+AnyProductService = Union[ProductService, AsyncProductService]
+
+
+async def get_product_service():
+    """
+    Product service dependency
+    
+    Yields an AsyncProductService over an AsyncSession when settings.async_database
+    is enabled, otherwise a ProductService over the regular sync Session.
+    """
+    if settings.async_database:
+        async for db in get_async_db():
+            yield AsyncProductService(db)
+    else:
+        for db in get_db():
+            yield ProductService(db)
+
+
+async def get_read_product_service():
+    """
+    Product service dependency for catalog reads
+    
+    Like get_product_service, but over a read replica session when replicas are
+    configured (see get_read_db), so list / detail reads stay off the primary.
+    """
+    if settings.async_database:
+        async for db in get_async_read_db():
+            yield AsyncProductService(db)
+    else:
+        for db in get_read_db():
+            yield ProductService(db)
+
+
+async def resolve(method, *args):
+    """
+    Call a product service method from an async route
+    
+    AsyncProductService methods are awaited. Blocking ProductService methods run
+    in the threadpool, so a request waiting for a pooled connection does not
+    stall the event loop (and with it the requests that would free one). A
+    route awaits each call before making the next, so its Session is only
+    ever used by one thread at a time.
+    """
+    if inspect.iscoroutinefunction(method):
+        return await method(*args)
+    return await run_in_threadpool(method, *args)
+
 
 class BaseProductRouter:
     """Base router with common product functionality"""
@@ -21,6 +101,73 @@ class BaseProductRouter:
             methods=["GET"], 
             response_model=ProductListResponse
         )
+        self.router.add_api_route(
+            "/bulk",
+            self.bulk_create_products,
+            methods=["POST"],
+            response_model=BulkOperationResponse
+        )
+        self.router.add_api_route(
+            "/bulk",
+            self.bulk_update_products,
+            methods=["PATCH"],
+            response_model=BulkOperationResponse
+        )
+        self.router.add_api_route(
+            "/bulk",
+            self.bulk_delete_products,
+            methods=["DELETE"],
+            response_model=BulkOperationResponse
+        )
+        self.router.add_api_route(
+            "/stock",
+            self.adjust_stock,
+            methods=["POST"],
+            response_model=StockAdjustmentResponse
+        )
+        self.router.add_api_route(
+            "/import",
+            self.import_products,
+            methods=["POST"],
+            response_model=ImportJobResponse,
+            status_code=status.HTTP_202_ACCEPTED
+        )
+        self.router.add_api_route(
+            "/import/{job_id}",
+            self.get_import_status,
+            methods=["GET"],
+            response_model=ImportJobResponse
+        )
+        self.router.add_api_route(
+            "/import/{job_id}/errors",
+            self.get_import_errors,
+            methods=["GET"],
+            response_model=ImportErrorReport
+        )
+        self.router.add_api_route(
+            "/changes",
+            self.get_changes,
+            methods=["GET"],
+            response_model=ProductChangesResponse
+        )
+        self.router.add_api_route(
+            "/stream",
+            self.stream_changes,
+            methods=["GET"],
+            response_class=StreamingResponse
+        )
+        self.router.add_api_websocket_route("/stream", self.stream_changes_ws)
+        self.router.add_api_route(
+            "/cache/stats",
+            self.get_cache_stats,
+            methods=["GET"]
+        )
+        self.router.add_api_route(
+            "/export",
+            self.export_products,
+            methods=["GET"],
+            response_class=StreamingResponse
+        )
         self.router.add_api_route(
             "/{product_id}", 
             self.get_product_by_id, 
@@ -40,6 +187,12 @@ class BaseProductRouter:
             methods=["PUT"], 
             response_model=ProductResponse
         )
+        self.router.add_api_route(
+            "/{product_id}/stock",
+            self.adjust_product_stock,
+            methods=["POST"],
+            response_model=ProductResponse
+        )
         self.router.add_api_route(
             "/{product_id}", 
             self.delete_product, 
@@ -47,22 +200,308 @@ class BaseProductRouter:
             status_code=status.HTTP_204_NO_CONTENT
         )
     
-    async def get_all_products(self, db: Session = Depends(get_db)):
-        """Get all products - can be overridden for version-specific behavior"""
+    async def conditional_response(self, request: Request, response: Response, service: AnyProductService, *etag_parts) -> Optional[Response]:
+        """
+        Attach ETag / Last-Modified derived from the catalog version
+        
+        Returns a 304 response when the client's copy is still current, so the
+        caller can skip the query and serialization entirely.
+        """
+        catalog_version = await resolve(service.get_catalog_version)
+        if catalog_version is None:
+            return None
+        
+        version, updated_at = catalog_version
+        etag = make_etag(version, *etag_parts)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(updated_at),
+            # Let browsers keep the body but revalidate on every use
+            "Cache-Control": "no-cache"
+        }
+        if is_not_modified(request, etag, updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return None
+    
+    async def get_all_products(
+        self,
+        request: Request,
+        response: Response,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        sort_by: Literal["name", "price", "quantity"] = "name",
+        order: Literal["asc", "desc"] = "asc",
+        service: AnyProductService = Depends(get_read_product_service)
+    ):
+        """
+        Get all products - can be overridden for version-specific behavior
+        
+        Without `limit` or `cursor` the whole catalog is returned. Otherwise one
+        keyset page sorted by (sort_by, id) is returned together with `next_cursor`.
+        """
         try:
-            service = ProductService(db)
-            return service.get_all_products()
+            not_modified = await self.conditional_response(request, response, service, "list", limit, cursor, sort_by, order)
+            if not_modified:
+                return not_modified
+            if limit is None and cursor is None:
+                payload = await resolve(service.get_all_products_payload)
+            else:
+                payload = await resolve(service.get_products_page_payload, limit or DEFAULT_PAGE_SIZE, cursor, sort_by, order)
+            # Rows come straight from the database - skip the response_model validation pass
+            return FastJSONResponse(payload, headers=dict(response.headers))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error retrieving products: {str(e)}"
             )
     
-    async def get_product_by_id(self, product_id: UUID, db: Session = Depends(get_db)):
+    async def bulk_create_products(self, products: List[ProductCreate] = Body(..., max_length=settings.bulk_max_items), service: AnyProductService = Depends(get_product_service)):
+        """Create many products in chunked multi-row inserts - failed items are reported, not raised"""
+        try:
+            return await resolve(service.bulk_create_products, products)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error creating products: {str(e)}"
+            )
+    
+    async def bulk_update_products(self, products: List[ProductBulkUpdate] = Body(..., max_length=settings.bulk_max_items), service: AnyProductService = Depends(get_product_service)):
+        """Update many products by UUID in chunked batches - unknown UUIDs are reported per item"""
+        try:
+            return await resolve(service.bulk_update_products, products)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error updating products: {str(e)}"
+            )
+    
+    async def bulk_delete_products(self, request: ProductBulkDelete, service: AnyProductService = Depends(get_product_service)):
+        """Delete many products by UUID in chunked batches - unknown UUIDs are reported per item"""
+        try:
+            return await resolve(service.bulk_delete_products, request.ids)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error deleting products: {str(e)}"
+            )
+    
+    async def adjust_stock(
+        self,
+        adjustments: List[ProductStockAdjustment],
+        atomic: bool = True,
+        service: AnyProductService = Depends(get_product_service)
+    ):
+        """
+        Adjust the stock of many products in one transaction
+        
+        Each item is a conditional UPDATE, so a decrement never takes a quantity
+        below zero. With atomic (the default) nothing is applied unless every item
+        fits - e.g. reserving all lines of an order - otherwise the items that fit
+        are applied and the rest reported per item.
+        """
+        if len(adjustments) > settings.bulk_chunk_size:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"At most {settings.bulk_chunk_size} adjustments per request"
+            )
+        try:
+            return await resolve(service.adjust_stock, adjustments, atomic)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error adjusting stock: {str(e)}"
+            )
+    
+    async def adjust_product_stock(
+        self,
+        product_id: UUID,
+        adjustment: StockAdjustment,
+        service: AnyProductService = Depends(get_product_service)
+    ):
+        """
+        Adjust one product's stock atomically - 409 if a decrement exceeds the stock
+        
+        Runs UPDATE ... SET quantity = quantity + :delta WHERE id = :id AND
+        quantity >= -:delta RETURNING ..., so concurrent reservations never
+        oversell or overwrite each other, unlike a PUT of the new quantity.
+        """
+        try:
+            result = await resolve(
+                service.adjust_stock, [ProductStockAdjustment(id=product_id, delta=adjustment.delta)], True
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error adjusting stock: {str(e)}"
+            )
+        if result.errors:
+            error = result.errors[0]
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND if error.available is None else status.HTTP_409_CONFLICT,
+                detail=error.error
+            )
+        return result.products[0]
+    
+    async def import_products(
+        self,
+        request: Request,
+        background_tasks: BackgroundTasks,
+        format: Optional[Literal["csv", "ndjson"]] = None,
+        upsert_by_name: bool = False
+    ):
+        """
+        Import products from a CSV or NDJSON request body as a background job
+        
+        The body is streamed to a temporary file, then parsed, validated and
+        loaded in chunks after the response is sent. The format comes from
+        `format` or the Content-Type. Poll /import/{job_id} for progress and
+        /import/{job_id}/errors for the rejected rows.
+        """
+        import_format = format or detect_import_format(request.headers.get("content-type"))
+        if import_format not in IMPORT_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+            )
+        try:
+            job = await create_import_job(request.stream(), import_format, upsert_by_name)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error receiving import: {str(e)}"
+            )
+        background_tasks.add_task(run_import_job, job)
+        return job.to_response()
+    
+    async def get_import_status(self, job_id: UUID):
+        """Progress and counters of an import job - recorded in the database, so any worker can answer"""
+        job = await run_in_threadpool(get_import_job, job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+        return job
+    
+    async def get_import_errors(self, job_id: UUID):
+        """Rows rejected by an import job, with line numbers and reasons"""
+        report = await run_in_threadpool(get_import_errors, job_id)
+        if report is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+        return report
+    
+    async def get_changes(
+        self,
+        since: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=settings.change_feed_max_limit),
+        service: AnyProductService = Depends(get_read_product_service)
+    ):
+        """
+        Product upserts and tombstones after change log seq `since`
+        
+        Start from since=0 to get every live product, then keep passing back
+        next_since to apply only what changed. 410 means tombstones the client
+        has not read were compacted away - it has to resync from since=0.
+        """
+        try:
+            changes = await resolve(service.get_changes, since, limit)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error retrieving product changes: {str(e)}"
+            )
+        if changes is None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Changes after this seq have been compacted - resync from since=0"
+            )
+        return changes
+    
+    async def stream_changes(self, request: Request, last_event_id: Optional[int] = Query(None, ge=0)):
+        """
+        Server-Sent Events stream of product upserts and tombstones
+        
+        Each event's id is its change log seq, so a reconnecting EventSource
+        resumes after the last event it saw (Last-Event-ID header, or the
+        last_event_id query parameter on a first connect). A "reset" event means
+        that position was compacted away and the client has to reload the list.
+        """
+        header = request.headers.get("last-event-id")
+        if header:
+            try:
+                last_event_id = int(header)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Last-Event-ID must be a change seq")
+        
+        async def frames():
+            # Reconnection delay for EventSource, in milliseconds
+            yield "retry: 3000\n\n"
+            async for event in change_broadcaster.events(last_event_id):
+                yield format_sse(event)
+        
+        return StreamingResponse(
+            frames(),
+            media_type="text/event-stream",
+            # Keep proxies from buffering the stream
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    async def stream_changes_ws(self, websocket: WebSocket, last_event_id: Optional[int] = Query(None, ge=0)):
+        """WebSocket variant of the change stream - JSON messages {"id", "event", "data"}"""
+        await websocket.accept()
+        
+        async def send():
+            async for event in change_broadcaster.events(last_event_id):
+                await websocket.send_text(format_ws(event))
+        
+        async def receive():
+            # Nothing is expected from the client - reading only notices when it goes away
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        
+        tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def get_cache_stats(self):
+        """Hit ratio, eviction and invalidation counters of the product read-through cache"""
+        return product_cache.stats()
+    
+    async def export_products(
+        self,
+        format: Literal["ndjson", "csv"] = "ndjson",
+        batch_size: int = Query(1000, ge=1, le=10000)
+    ):
+        """Stream the full catalog as NDJSON or CSV without building it in memory"""
+        return StreamingResponse(
+            stream_product_export(format, batch_size),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+        )
+    
+    async def get_product_by_id(self, product_id: UUID, request: Request, response: Response, service: AnyProductService = Depends(get_read_product_service)):
         """Get product by UUID - can be overridden for version-specific behavior"""
         try:
-            service = ProductService(db)
-            product = service.get_product_by_id(product_id)
+            product = None
+            if matches_any(request):
+                # If-None-Match: * must not turn a missing product into a 304
+                product = await resolve(service.get_product_by_id, product_id)
+                if product is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Product not found"
+                    )
+            not_modified = await self.conditional_response(request, response, service, "product", product_id)
+            if not_modified:
+                return not_modified
+            if product is None:
+                product = await resolve(service.get_product_by_id, product_id)
             if product:
                 return product
             raise HTTPException(
@@ -77,22 +516,20 @@ class BaseProductRouter:
                 detail=f"Error retrieving product: {str(e)}"
             )
     
-    async def create_product(self, product: ProductCreate, db: Session = Depends(get_db)):
+    async def create_product(self, product: ProductCreate, service: AnyProductService = Depends(get_product_service)):
         """Create product - can be overridden for version-specific validation"""
         try:
-            service = ProductService(db)
-            return service.create_product(product)
+            return await resolve(service.create_product, product)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating product: {str(e)}"
             )
     
-    async def update_product(self, product_id: UUID, product: ProductUpdate, db: Session = Depends(get_db)):
+    async def update_product(self, product_id: UUID, product: ProductUpdate, service: AnyProductService = Depends(get_product_service)):
         """Update product - can be overridden for version-specific behavior"""
         try:
-            service = ProductService(db)
-            updated_product = service.update_product(product_id, product)
+            updated_product = await resolve(service.update_product, product_id, product)
             if updated_product:
                 return updated_product
             raise HTTPException(
@@ -107,11 +544,10 @@ class BaseProductRouter:
                 detail=f"Error updating product: {str(e)}"
             )
     
-    async def delete_product(self, product_id: UUID, db: Session = Depends(get_db)):
+    async def delete_product(self, product_id: UUID, service: AnyProductService = Depends(get_product_service)):
         """Delete product - can be overridden for version-specific behavior"""
         try:
-            service = ProductService(db)
-            success = service.delete_product(product_id)
+            success = await resolve(service.delete_product, product_id)
             if success:
                 return
             raise HTTPException(
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.services.ai_service import get_ai_product_filters
+from app.services.ai_service import get_ai_product_filters_async, filter_cache, filter_flights, query_parser, search_products_batch
 from app.repositories.product_repository import ProductRepository
-from app.core.database import get_db
-from app.models.schemas import ProductResponse, ProductListResponse, ProductQuery
+from app.config.settings import settings
+from app.core.database import get_db, get_read_db, init_product_index
+from app.core.product_index import product_index
+from app.models.schemas import ProductResponse, ProductListResponse, ProductQuery, ProductQueryBatch, ProductSearchBatchResponse
 
 router = APIRouter()
 
@@ -12,28 +15,69 @@ router = APIRouter()
 async def debug_ai_product_filters(user_query: str):
     """Debug endpoint to test AI-generated product filters from natural language."""
     try:
-        ai_response = get_ai_product_filters(user_query)
+        ai_response = await get_ai_product_filters_async(user_query)
         return {"ai_response": ai_response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating AI filters: {str(e)}")
 
 
+@router.get("/debug/cache-stats")
+async def debug_filter_cache_stats():
+    """Debug endpoint reporting hit/miss counters of the query -> filters cache."""
+    return {**filter_cache.stats(), **filter_flights.stats()}
+
+
+@router.get("/debug/fast-path-stats")
+async def debug_fast_path_stats():
+    """Debug endpoint reporting how many queries the rule-based parser answered without the LLM."""
+    return query_parser.stats()
+
+
+@router.get("/debug/index-stats")
+async def debug_product_index_stats():
+    """Debug endpoint reporting size and memory of the in-process product index."""
+    return product_index.stats()
+
+
+@router.get("/debug/index-verify")
+def debug_product_index_verify(db: Session = Depends(get_db)):
+    """Compare the in-process product index against the products table."""
+    if not product_index.ready:
+        raise HTTPException(status_code=409, detail="Product index is not enabled")
+    report = product_index.verify(ProductRepository(db).get_all())
+    return {"consistent": not any(report.values()), **report}
+
+
+@router.post("/debug/index-rebuild")
+def debug_product_index_rebuild():
+    """Rebuild the in-process product index from the products table."""
+    if not product_index.enabled:
+        raise HTTPException(status_code=409, detail="Product index is not enabled")
+    init_product_index()
+    return product_index.stats()
+
+
 @router.post("/product-search", response_model=ProductListResponse)
 async def search_products_with_ai(
     query: ProductQuery,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Search products using AI-generated filters from natural language query."""
     try:
         # Generate filters using AI
-        ai_filters = get_ai_product_filters(query.user_query)
+        ai_filters = await get_ai_product_filters_async(query.user_query)
         
         # Create repository and search with filters
-        product_repo = ProductRepository(db)
-        products = product_repo.get_with_filters(ai_filters)
-        
-        # Convert to response format
-        product_responses = [ProductResponse.model_validate(product) for product in products]
+        if product_index.enabled and product_index.ready:
+            # Evaluate the filters in memory - no database round-trip
+            product_responses = product_index.search(ai_filters, limit=settings.search_result_limit)
+        else:
+            # Query off the event loop - many searches can be awaiting the LLM while holding a session
+            product_repo = ProductRepository(db)
+            products = await run_in_threadpool(product_repo.get_with_filters, ai_filters)
+            
+            # Convert to response format
+            product_responses = [ProductResponse.model_validate(product) for product in products]
         
         return ProductListResponse(
             products=product_responses,
@@ -43,3 +87,20 @@ async def search_products_with_ai(
         # Log the error for debugging
         print(f"Error in search_products_with_ai: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error searching products: {str(e)}")
+
+
+@router.post("/product-search/batch", response_model=ProductSearchBatchResponse)
+async def search_products_with_ai_batch(
+    batch: ProductQueryBatch,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Run many natural language searches at once - per-query results and errors in request order.
+    
+    Unique queries are translated concurrently and searched in one session, so the
+    batch takes about as long as its slowest query rather than the sum of them.
+    """
+    try:
+        return await search_products_batch(batch.user_queries, ProductRepository(db))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching products: {str(e)}")
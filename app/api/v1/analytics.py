@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core.database import get_db, get_read_db
+from app.models.schemas import InventoryStatsResponse, InventoryStatsVerifyResponse
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter()
+
+
+@router.get("/inventory", response_model=InventoryStatsResponse)
+def inventory_stats(db: Session = Depends(get_read_db)):
+    """Total SKUs, stock units, inventory value, low-stock count and price / quantity histograms."""
+    try:
+        return AnalyticsService(db).get_inventory_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving inventory stats: {str(e)}")
+
+
+@router.post("/inventory/verify", response_model=InventoryStatsVerifyResponse)
+def verify_inventory_stats(repair: bool = False, db: Session = Depends(get_db)):
+    """Compare the stored aggregates with a full recompute, and rebuild them if `repair` is set."""
+    try:
+        return AnalyticsService(db).verify_inventory_stats(repair=repair)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error verifying inventory stats: {str(e)}")
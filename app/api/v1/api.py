@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import products, ai
+from app.api.v1 import products, ai, system, analytics
 
 api_router = APIRouter()
 
@@ -14,3 +14,15 @@ api_router.include_router(
     prefix="/ai",
     tags=["ai"]
 )
+
+api_router.include_router(
+    system.router,
+    prefix="/system",
+    tags=["system"]
+)
+
+api_router.include_router(
+    analytics.router,
+    prefix="/analytics",
+    tags=["analytics"]
+)
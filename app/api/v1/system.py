@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from app.core.database import async_engine, engine, read_replicas
+from app.core.db_metrics import db_metrics, pool_status
+
+router = APIRouter()
+
+
+@router.get("/db-stats")
+async def db_stats():
+    """Connection pool occupancy, checkout wait times, statement totals since startup and read replica health."""
+    stats = {"pool": pool_status(engine), **db_metrics.stats()}
+    if async_engine is not None:
+        stats["async_pool"] = pool_status(async_engine.sync_engine)
+    if read_replicas.replicas:
+        stats["read_replicas"] = read_replicas.stats()
+        for replica, replica_stats in zip(read_replicas.replicas, stats["read_replicas"]["replicas"]):
+            replica_stats["pool"] = pool_status(replica.engine)
+    return stats
@@ -1,8 +1,35 @@
-from openai import OpenAI
+from functools import lru_cache
 from .settings import settings
 
-# Initialize OpenAI client
-ai_client = OpenAI(
-    base_url="https://api.groq.com/openai/v1",
-    api_key=settings.api_kaiey
-)
\ No newline at end of file
+AI_BASE_URL = "https://api.groq.com/openai/v1"
+
+# The openai package takes a large share of import time, so the clients are
+# built (and the package imported) on first use rather than at import.
+
+
+def get_ai_timeout():
+    """Connect and read timeouts shared by both clients"""
+    import httpx
+    return httpx.Timeout(settings.ai_read_timeout, connect=settings.ai_connect_timeout)
+
+
+@lru_cache(maxsize=None)
+def get_ai_client():
+    """OpenAI client, created on first use"""
+    from openai import OpenAI
+    return OpenAI(
+        base_url=AI_BASE_URL,
+        api_key=settings.api_kaiey,
+        timeout=get_ai_timeout()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_ai_client():
+    """Non-blocking client used by the async AI search path, created on first use"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        base_url=AI_BASE_URL,
+        api_key=settings.api_kaiey,
+        timeout=get_ai_timeout()
+    )
@@ -0,0 +1,105 @@
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import case, func, literal
+from sqlalchemy.sql.elements import ColumnElement
+from app.config.settings import settings
+
+# Running totals kept in inventory_aggregates next to one count per histogram bucket
+TOTAL_KEYS = ("skus", "units", "value", "low_stock")
+
+HISTOGRAMS = ("price", "quantity")
+
+
+@lru_cache(maxsize=8)
+def _layout(histogram: str, edges: Tuple[float, ...]) -> Tuple[Tuple[float, ...], Tuple[str, ...]]:
+    """Sorted bucket edges and the aggregate key of each bucket [-inf, e1), [e1, e2), ..., [ek, inf)"""
+    edges = tuple(sorted(edges))
+    if not edges:
+        return edges, (f"{histogram}:all",)
+    labels = [f"<{edges[0]:g}"]
+    labels.extend(f"{low:g}-{high:g}" for low, high in zip(edges, edges[1:]))
+    labels.append(f">={edges[-1]:g}")
+    return edges, tuple(f"{histogram}:{label}" for label in labels)
+
+
+def _buckets(histogram: str) -> Tuple[Tuple[float, ...], Tuple[str, ...]]:
+    configured = settings.analytics_price_buckets if histogram == "price" else settings.analytics_quantity_buckets
+    return _layout(histogram, tuple(configured))
+
+
+def bucket_labels(histogram: str) -> List[str]:
+    """Labels of the buckets of a histogram, lowest first"""
+    return [key.split(":", 1)[1] for key in _buckets(histogram)[1]]
+
+
+def bucket_key(histogram: str, value: Optional[float]) -> str:
+    """Aggregate key of the bucket a price / quantity falls into (missing values count as 0)"""
+    edges, keys = _buckets(histogram)
+    return keys[bisect_right(edges, value or 0)]
+
+
+def bucket_expression(histogram: str, column: ColumnElement) -> ColumnElement:
+    """SQL twin of bucket_key, used by the full recompute"""
+    edges, keys = _buckets(histogram)
+    if not edges:
+        return literal(keys[0])
+    value = func.coalesce(column, 0)
+    return case(*((value < edge, key) for edge, key in zip(edges, keys)), else_=keys[-1])
+
+
+def aggregate_keys() -> List[str]:
+    """Every key the aggregates table holds for the configured buckets"""
+    keys = list(TOTAL_KEYS)
+    for histogram in HISTOGRAMS:
+        keys.extend(f"{histogram}:{label}" for label in bucket_labels(histogram))
+    return keys
+
+
+def _accumulate(deltas: Counter, rows: Sequence[tuple]) -> Counter:
+    # Bucket layout and threshold resolved once per batch, not per row
+    price_edges, price_keys = _buckets("price")
+    quantity_edges, quantity_keys = _buckets("quantity")
+    threshold = settings.low_stock_threshold
+    skus = units = value = low_stock = 0
+    for price, quantity, sign in rows:
+        price, quantity = price or 0, quantity or 0
+        skus += sign
+        units += sign * quantity
+        value += sign * price * quantity
+        if quantity <= threshold:
+            low_stock += sign
+        deltas[price_keys[bisect_right(price_edges, price)]] += sign
+        deltas[quantity_keys[bisect_right(quantity_edges, quantity)]] += sign
+    deltas.update(skus=skus, units=units, value=value, low_stock=low_stock)
+    return deltas
+
+
+def contribution(price: Optional[float], quantity: Optional[int], sign: int = 1) -> Counter:
+    """
+    What one product adds to the aggregates (sign=-1: what removing it takes away)
+
+    An update is the contribution of the new values plus the negated contribution
+    of the old ones.
+    """
+    return _accumulate(Counter(), [(price, quantity, sign)])
+
+
+def net_deltas(rows: Sequence[tuple]) -> Counter:
+    """Summed deltas of (old (price, quantity) or None, new (price, quantity) or None) pairs"""
+    signed = []
+    for old, new in rows:
+        if old is not None:
+            signed.append((*old, -1))
+        if new is not None:
+            signed.append((*new, 1))
+    return _accumulate(Counter(), signed)
+
+
+def histogram_counts(values: Dict[str, float], name: str) -> List[dict]:
+    """Ordered [{"bucket", "count"}] of one histogram from the stored aggregates"""
+    return [
+        {"bucket": label, "count": int(values.get(f"{name}:{label}", 0))}
+        for label in bucket_labels(name)
+    ]
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional, Set, Tuple
+from app.config.settings import settings
+from app.core.database import SessionLocal
+from app.core.metrics import CallbackGauge, Counter, metrics
+from app.models.schemas import ProductChangesResponse
+
+# (seq, event name, JSON data) of one pushed event - serialized once, shared by every subscriber
+StreamEvent = Tuple[int, str, str]
+
+RESET_EVENT = "reset"
+
+logger = logging.getLogger(__name__)
+
+
+def read_changes(since: int, limit: int) -> Optional[ProductChangesResponse]:
+    db = SessionLocal()
+    try:
+        from app.services.product_service import ProductService
+        return ProductService(db).get_changes(since, limit)
+    finally:
+        db.close()
+
+
+def read_change_head() -> int:
+    db = SessionLocal()
+    try:
+        from app.repositories.product_repository import ProductRepository
+        return ProductRepository(db).get_change_head()
+    finally:
+        db.close()
+
+
+def change_events(page: ProductChangesResponse):
+    for change in page.changes:
+        yield change.seq, change.op, change.model_dump_json()
+
+
+class Subscriber:
+    """One connected stream client - a bounded queue of events and the last seq it was sent"""
+
+    __slots__ = ("queue", "last_seq", "catch_up")
+
+    def __init__(self, last_seq: int, catch_up: bool):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.product_stream_queue_size)
+        self.last_seq = last_seq
+        # Read from the change log before serving the queue: set for a resume, and when the queue overflowed
+        self.catch_up = catch_up
+
+
+class ProductChangeBroadcaster:
+    """
+    Fan-out of the product change log to SSE / WebSocket subscribers
+
+    One task per process polls the change log (GET /products/changes) every
+    product_stream_poll_interval seconds, or as soon as a local write calls
+    notify, and hands each event, serialized once, to every subscriber's
+    bounded queue. Writes made by other processes arrive through the log, so
+    any number of workers can serve streams. Nothing is polled while nobody
+    is subscribed, and an idle subscriber costs a queue and a parked coroutine.
+
+    A subscriber whose queue fills up (a slow client) is not waited for: it
+    stops receiving from the queue and instead catches up from the change log
+    at its own pace, the same way a client resuming with Last-Event-ID does.
+    """
+
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.head: Optional[int] = None  # last seq read from the log, None while nobody is subscribed
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.catch_ups = metrics.register(Counter(
+            "product_stream_catch_ups_total", "Stream subscribers switched to a change log read because their queue was full"
+        ))
+        metrics.register(CallbackGauge(
+            "product_stream_subscribers", "Connected product change stream subscribers", lambda: len(self.subscribers)
+        ))
+
+    def notify(self):
+        """Wake the poller after a local product write - safe to call from any thread"""
+        if self._loop is not None and self.subscribers:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # the loop that ran the poller has been closed
+
+    async def run(self):
+        """Poll the change log and publish new entries - run as a task by the app lifespan"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.product_stream_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self.subscribers:
+                self.head = None
+                continue
+            try:
+                await self._poll()
+            except Exception:
+                logger.exception("Product change stream poll failed")
+
+    async def _poll(self):
+        while self.subscribers:
+            page = await asyncio.to_thread(read_changes, self.head, settings.change_feed_max_limit)
+            if page is None:
+                # Compaction passed the poller's position - every subscriber has to resync
+                head = await asyncio.to_thread(read_change_head)
+                self._publish((head, RESET_EVENT, json.dumps({"next_since": head})))
+                self.head = head
+                return
+            for event in change_events(page):
+                self._publish(event)
+            self.head = page.next_since
+            if not page.has_more:
+                return
+
+    def _publish(self, event: StreamEvent):
+        for subscriber in self.subscribers:
+            if subscriber.catch_up:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.catch_up = True
+                self.catch_ups.inc()
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> Subscriber:
+        """Register a subscriber - from last_event_id when resuming, otherwise from now on"""
+        if self.head is None:
+            head = await asyncio.to_thread(read_change_head)
+            if self.head is None:
+                self.head = head
+        subscriber = Subscriber(self.head if last_event_id is None else last_event_id, catch_up=last_event_id is not None)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    async def _replay(self, subscriber: Subscriber) -> AsyncIterator[StreamEvent]:
+        while True:
+            page = await asyncio.to_thread(read_changes, subscriber.last_seq, settings.change_feed_max_limit)
+            if page is None:
+                head = await asyncio.to_thread(read_change_head)
+                subscriber.last_seq = head
+                yield head, RESET_EVENT, json.dumps({"next_since": head})
+                return
+            for event in change_events(page):
+                subscriber.last_seq = event[0]
+                yield event
+            subscriber.last_seq = max(subscriber.last_seq, page.next_since)
+            if not page.has_more:
+                return
+
+    async def events(self, last_event_id: Optional[int] = None) -> AsyncIterator[Optional[StreamEvent]]:
+        """
+        Subscribe and yield events in seq order - None when a heartbeat is due
+
+        With last_event_id the stream resumes after that seq, replaying what the
+        client missed from the change log first. Unsubscribes when the consumer
+        stops iterating (the client went away).
+        """
+        subscriber = await self.subscribe(last_event_id)
+        try:
+            while True:
+                if subscriber.catch_up:
+                    # Clear the flag first, so events published during the read are queued and only
+                    # the ones the read already returned are skipped below
+                    subscriber.catch_up = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    async for event in self._replay(subscriber):
+                        yield event
+                    continue
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), settings.product_stream_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event[1] != RESET_EVENT and event[0] <= subscriber.last_seq:
+                    continue
+                subscriber.last_seq = event[0]
+                yield event
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "catching_up": sum(1 for subscriber in self.subscribers if subscriber.catch_up),
+            "head": self.head
+        }
+
+
+def format_sse(event: Optional[StreamEvent]) -> str:
+    """Server-Sent Events frame - a comment line keeps an idle connection alive"""
+    if event is None:
+        return ": heartbeat\n\n"
+    seq, name, data = event
+    return f"id: {seq}\nevent: {name}\ndata: {data}\n\n"
+
+
+def format_ws(event: Optional[StreamEvent]) -> str:
+    """WebSocket text message - {"id", "event", "data"}, or {"event": "heartbeat"}"""
+    if event is None:
+        return '{"event": "heartbeat"}'
+    seq, name, data = event
+    return f'{{"id": {seq}, "event": "{name}", "data": {data}}}'
+
+
+change_broadcaster = ProductChangeBroadcaster()
@@ -1,19 +1,126 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.config.settings import settings
-from app.models import Base, Product
+from app.core.analytics import aggregate_keys
+from app.core.db_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+from app.core.product_index import product_index
+from app.core.read_replicas import Replica, ReplicaRouter, mark_write
+from app.core.search import setup_text_search
+from app.models import Base, Product, CatalogVersion, ChangeLogHorizon
+from datetime import datetime, timezone
+
+
+def get_engine_options(database_url: str, async_engine: bool = False) -> dict:
+    """
+    Engine keyword arguments built from the db_* settings
+    
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool since a
+    second connection would see a different database; every other URL gets an
+    instrumented QueuePool sized from settings.
+    """
+    options = {"echo": settings.db_echo, "pool_pre_ping": settings.db_pool_pre_ping}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle
+    )
+    return options
+
+
+def create_sync_engine(database_url: str):
+    """Instrumented engine for one database URL, sized from the db_* settings"""
+    sync_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False} if "sqlite" in database_url else {},
+        **get_engine_options(database_url)
+    )
+    instrument_engine(sync_engine)
+    return sync_engine
+
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-    echo=True
-)
+engine = create_sync_engine(settings.database_url)
+# Requests that commit on the primary pin their client's reads to it (see read_your_writes in main.py)
+event.listen(engine, "commit", mark_write)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def get_async_database_url(database_url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto its asyncio driver
+    
+    PostgreSQL URLs are switched to asyncpg and SQLite URLs to aiosqlite,
+    so the same DATABASE_URL serves both the sync and the async engine.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine and session factory - only built when the async path is enabled
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.async_database:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        **get_engine_options(settings.database_url, async_engine=True)
+    )
+    instrument_engine(async_engine.sync_engine)
+    event.listen(async_engine.sync_engine, "commit", mark_write)
+    # expire_on_commit=False keeps committed objects readable without a lazy reload
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+def create_replica(database_url: str) -> Replica:
+    """Engines and session factories of one read replica - sessions are tagged read_replica in Session.info"""
+    replica_engine = create_sync_engine(database_url)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"read_replica": True})
+    replica_async_engine = async_session_factory = None
+    if settings.async_database:
+        replica_async_engine = create_async_engine(
+            get_async_database_url(database_url),
+            **get_engine_options(database_url, async_engine=True)
+        )
+        instrument_engine(replica_async_engine.sync_engine)
+        async_session_factory = async_sessionmaker(
+            bind=replica_async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+            info={"read_replica": True}
+        )
+    return Replica(database_url, replica_engine, session_factory, replica_async_engine, async_session_factory)
+
+
+# Engines are created lazily by the pool, so no replica is contacted until the first read or health check
+read_replicas = ReplicaRouter(
+    engine,
+    [create_replica(url) for url in settings.database_read_urls],
+    check_interval=settings.db_replica_check_interval,
+    max_lag_seconds=settings.db_replica_max_lag_seconds
+)
+
+
 def get_db() -> Session:
     """
     Database dependency function
@@ -31,6 +138,52 @@ def get_db() -> Session:
         db.close()
 
 
+def get_read_db() -> Session:
+    """
+    Read-only database dependency for catalog reads
+    
+    Yields a session on the next healthy read replica, or on the primary when
+    no replica is configured or healthy, or when the client wrote within the
+    last settings.read_your_writes_seconds.
+    
+    Yields:
+        Session: Database session for the current request
+    """
+    replica = read_replicas.pick()
+    db = replica.session_factory() if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncSession:
+    """
+    Async database dependency function
+    
+    Provides an AsyncSession to our API endpoints when settings.async_database
+    is enabled, and closes it once the request is finished.
+    
+    Yields:
+        AsyncSession: Async database session for the current request
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled - set ASYNC_DATABASE=true to enable it")
+    
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncSession:
+    """Async counterpart of get_read_db"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled - set ASYNC_DATABASE=true to enable it")
+    
+    replica = read_replicas.pick()
+    async with (replica.async_session_factory() if replica else AsyncSessionLocal()) as db:
+        yield db
+
+
 def init_db():
     """
     Initialize the database with sample data
@@ -44,25 +197,88 @@ def init_db():
         # Create all tables
         Base.metadata.create_all(bind=engine)
         
+        # create_all skips existing tables, so add indexes introduced after the table was created
+        for index in Product.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        
+        setup_text_search(engine)
+        
+        # Seed the catalog version row that product writes bump
+        if db.get(CatalogVersion, 1) is None:
+            db.add(CatalogVersion(id=1, version=0, updated_at=datetime.now(timezone.utc).replace(tzinfo=None)))
+            db.commit()
+        if db.get(ChangeLogHorizon, 1) is None:
+            db.add(ChangeLogHorizon(id=1, compacted_through=0))
+            db.commit()
+        
         # Check if products already exist in the database
         count = db.query(Product).count()
-        if count > 0:
-            return  # Database already has data, skip initialization
+        if count == 0:
+            # Add sample products to the database (without IDs - auto-generated UUIDs)
+            from app.models.schemas import ProductCreate
+            sample_products = [
+                ProductCreate(name="Product 1", price=10.0, description="Description 1", quantity=10),
+                ProductCreate(name="Product 2", price=20.0, description="Description 2", quantity=20),
+                ProductCreate(name="Product 3", price=30.0, description="Description 3", quantity=30)
+            ]
+            
+            for product_data in sample_products:
+                db_product = Product(**product_data.model_dump())
+                db.add(db_product)
+            db.commit()
         
-        # Add sample products to the database (without IDs - auto-generated UUIDs)
-        from app.models.schemas import ProductCreate
-        sample_products = [
-            ProductCreate(name="Product 1", price=10.0, description="Description 1", quantity=10),
-            ProductCreate(name="Product 2", price=20.0, description="Description 2", quantity=20),
-            ProductCreate(name="Product 3", price=30.0, description="Description 3", quantity=30)
-        ]
+        # Build the inventory aggregates on first start, or when the configured buckets changed
+        from app.repositories.product_repository import ProductRepository
+        repository = ProductRepository(db)
+        if count == 0 or set(repository.get_inventory_stats()) != set(aggregate_keys()):
+            repository.recompute_inventory_stats()
         
-        for product_data in sample_products:
-            db_product = Product(**product_data.model_dump())
-            db.add(db_product)
-        db.commit()
+        # Log the existing catalog once, so change feed clients can bootstrap from since=0
+        repository.backfill_changes()
     except Exception as e:
         db.rollback()
         raise e
     finally:
         db.close()
+
+
+def init_product_index():
+    """
+    Build the in-process product index from the database
+    
+    Does nothing unless settings.product_index_enabled is set. Also used to
+    rebuild the index when a consistency check finds it out of date.
+    """
+    if not product_index.enabled:
+        return
+    
+    db = SessionLocal()
+    try:
+        from app.repositories.product_repository import ProductRepository
+        repository = ProductRepository(db)
+        # Version first: a write committing after it is either in get_all or replayed by rebuild
+        catalog_version = repository.get_catalog_version()
+        product_index.rebuild(repository.get_all(), catalog_version[0] if catalog_version else None)
+    finally:
+        db.close()
+
+
+def compact_change_log():
+    """Compact the product change log with the configured tombstone retention - returns (superseded, tombstones, horizon)"""
+    db = SessionLocal()
+    try:
+        from app.repositories.product_repository import ProductRepository
+        return ProductRepository(db).compact_changes(settings.change_log_tombstone_retention_seconds)
+    finally:
+        db.close()
+
+
+async def run_change_log_compaction():
+    """Compact the change log every settings.change_log_compaction_interval seconds - run as a task by the app lifespan"""
+    while True:
+        await asyncio.sleep(settings.change_log_compaction_interval)
+        try:
+            await asyncio.to_thread(compact_change_log)
+        except Exception:
+            # Keep compacting on the next tick - a failed run leaves the log as it was
+            logging.getLogger(__name__).exception("Change log compaction failed")
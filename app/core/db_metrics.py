@@ -0,0 +1,143 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.metrics import CallbackGauge, db_checkout_wait, db_statement_duration, metrics
+
+# A checkout waiting longer than this is counted as a slow checkout (pool starvation)
+SLOW_CHECKOUT_SECONDS = 0.1
+
+
+class RequestDBStats:
+    """Statements and database time accumulated while serving one request"""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by the HTTP middleware in main.py; engine events add to whatever is current
+current_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_request_stats", default=None)
+
+
+class DBMetrics:
+    """Process-wide pool and statement counters fed by SQLAlchemy pool/engine events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+        self.slow_checkouts = 0
+        self.statements = 0
+        self.statement_seconds = 0.0
+
+    def record_checkout_wait(self, seconds: float):
+        if metrics.enabled:
+            db_checkout_wait.observe((), seconds)
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds += seconds
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, seconds)
+            if seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+
+    def record_statement(self, statement: str, seconds: float):
+        if metrics.enabled:
+            operation = (statement.split(None, 1) or ["?"])[0].upper()
+            db_statement_duration.observe((operation,), seconds)
+        with self._lock:
+            self.statements += 1
+            self.statement_seconds += seconds
+        request_stats = current_request_stats.get()
+        if request_stats is not None:
+            request_stats.statements += 1
+            request_stats.seconds += seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_wait_ms_total": round(self.checkout_wait_seconds * 1000, 3),
+                "checkout_wait_ms_avg": round(self.checkout_wait_seconds * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_wait_ms_max": round(self.max_checkout_wait_seconds * 1000, 3),
+                "slow_checkouts": self.slow_checkouts,
+                "statements": self.statements,
+                "statement_ms_total": round(self.statement_seconds * 1000, 3),
+            }
+
+
+db_metrics = DBMetrics()
+
+metrics.register(CallbackGauge(
+    "db_pool_checked_out_connections", "Connections currently checked out of the pools",
+    lambda: db_metrics.checked_out
+))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_metrics.record_checkout_wait(time.perf_counter() - started)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_metrics.record_checkout_wait(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine):
+    """Attach checkout/checkin and statement timing listeners to a sync engine"""
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with db_metrics._lock:
+            db_metrics.checked_out += 1
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        with db_metrics._lock:
+            db_metrics.checked_out -= 1
+
+    # The start time lives on the statement's execution context, not the pooled
+    # connection: after_cursor_execute does not fire for a failing statement,
+    # which would otherwise leave its start behind for the next one to pop
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        db_metrics.record_statement(statement, time.perf_counter() - context._query_started)
+
+
+def pool_status(engine: Engine) -> Dict[str, float]:
+    """Live size / checked-in / overflow numbers of an engine's pool"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return status
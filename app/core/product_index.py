@@ -0,0 +1,264 @@
+import heapq
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+from app.config.settings import settings
+from app.models.schemas import ProductFilters, ProductResponse
+
+TRIGRAM = 3
+
+
+def _trigrams(value: str) -> Set[str]:
+    return {value[i:i + TRIGRAM] for i in range(len(value) - TRIGRAM + 1)}
+
+
+def _sort_key(product: ProductResponse):
+    """(name, id) with a NULL name first, as SQLite orders it"""
+    return product.name is not None, product.name or "", product.id
+
+
+class SortedColumn:
+    """Parallel sorted arrays of (value, product id) answering inclusive range queries"""
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.ids: List[UUID] = []
+
+    def add(self, value: Optional[float], product_id: UUID):
+        if value is None:
+            return
+        position = bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.ids.insert(position, product_id)
+
+    def remove(self, value: Optional[float], product_id: UUID):
+        if value is None:
+            return
+        for position in range(bisect_left(self.values, value), bisect_right(self.values, value)):
+            if self.ids[position] == product_id:
+                del self.values[position]
+                del self.ids[position]
+                return
+
+    def between(self, gt: Optional[float], lt: Optional[float]) -> List[UUID]:
+        start = bisect_left(self.values, gt) if gt is not None else 0
+        end = bisect_right(self.values, lt) if lt is not None else len(self.values)
+        return self.ids[start:end]
+
+
+class ProductIndex:
+    """
+    In-memory inverted index evaluating ProductFilters without touching the database
+
+    Name and description are indexed as trigram -> product id posting sets; a term
+    is answered by intersecting the postings of its trigrams and confirming the
+    substring, which keeps ILIKE '%term%' semantics. Price and quantity live in
+    sorted arrays. The index is rebuilt from ProductRepository.get_all at startup
+    and kept current by the repository write paths. Each worker process holds its
+    own copy, so writes made by other processes are only seen after a rebuild.
+
+    Writes are applied after their commit, so concurrent ones can arrive out of
+    order. Each carries the catalog version its transaction committed (see
+    ProductRepository.touch_catalog), and the index remembers the version of
+    every product it has applied or removed, ignoring anything older. Those
+    versions are kept until the next rebuild, deleted ids included.
+    """
+
+    def __init__(self):
+        self.enabled = settings.product_index_enabled
+        self.ready = False
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self, version: int = 0):
+        self.products: Dict[UUID, ProductResponse] = {}
+        # Catalog version each product was last written at - rebuild's version when not since
+        self._versions: Dict[UUID, int] = {}
+        self._rebuilt_at = version
+        self._text: Dict[str, Dict[UUID, str]] = {"name": {}, "description": {}}
+        self._postings: Dict[str, Dict[str, Set[UUID]]] = {
+            "name": defaultdict(set),
+            "description": defaultdict(set),
+        }
+        self._numeric = {"price": SortedColumn(), "quantity": SortedColumn()}
+
+    def _add(self, product: ProductResponse):
+        self.products[product.id] = product
+        for field in ("name", "description"):
+            value = (getattr(product, field) or "").lower()
+            self._text[field][product.id] = value
+            for trigram in _trigrams(value):
+                self._postings[field][trigram].add(product.id)
+        for field in ("price", "quantity"):
+            self._numeric[field].add(getattr(product, field), product.id)
+
+    def _discard(self, product_id: UUID):
+        product = self.products.pop(product_id, None)
+        if product is None:
+            return
+        for field in ("name", "description"):
+            value = self._text[field].pop(product_id)
+            postings = self._postings[field]
+            for trigram in _trigrams(value):
+                postings[trigram].discard(product_id)
+                if not postings[trigram]:
+                    del postings[trigram]
+        for field in ("price", "quantity"):
+            self._numeric[field].remove(getattr(product, field), product_id)
+
+    def _outdated(self, product_id: UUID, version: Optional[int]) -> bool:
+        return version is not None and version <= self._versions.get(product_id, self._rebuilt_at)
+
+    def rebuild(self, products: Iterable, version: Optional[int] = None):
+        """
+        Replace the index contents with the given ORM products
+
+        `version` is the catalog version read before the products. Writes
+        applied meanwhile with a later version are kept, since the products may
+        have been read before they committed.
+        """
+        version = version or 0
+        with self._lock:
+            newer = [
+                (product_id, written, self.products.get(product_id))
+                for product_id, written in self._versions.items() if written > version
+            ]
+            self._clear(version)
+            for product in products:
+                self._add(ProductResponse.model_validate(product))
+            for product_id, written, product in newer:
+                self._versions[product_id] = written
+                self._discard(product_id)
+                if product is not None:
+                    self._add(product)
+            self.ready = True
+
+    def upsert(self, product, version: Optional[int] = None):
+        """Index a created or updated ORM product written at catalog `version`"""
+        if not self.enabled:
+            return
+        response = ProductResponse.model_validate(product)
+        with self._lock:
+            if self._outdated(response.id, version):
+                return
+            if version is not None:
+                self._versions[response.id] = version
+            self._discard(response.id)
+            self._add(response)
+
+    def remove(self, product_id: UUID, version: Optional[int] = None):
+        """Drop a product deleted at catalog `version` from the index"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._outdated(product_id, version):
+                return
+            if version is not None:
+                self._versions[product_id] = version
+            self._discard(product_id)
+
+    def _match_term(self, field: str, term: str) -> Set[UUID]:
+        term = term.lower()
+        texts = self._text[field]
+        if len(term) < TRIGRAM:
+            return {product_id for product_id, value in texts.items() if term in value}
+
+        postings = self._postings[field]
+        trigram_sets = sorted((postings.get(trigram, set()) for trigram in _trigrams(term)), key=len)
+        candidates = set.intersection(*trigram_sets) if trigram_sets else set()
+        return {product_id for product_id in candidates if term in texts[product_id]}
+
+    def search_ids(self, filters: ProductFilters) -> Set[UUID]:
+        """Evaluate filters with the same OR-of-conditions semantics as ProductRepository.get_with_filters"""
+        with self._lock:
+            matches: Set[UUID] = set()
+            has_condition = False
+
+            for field in ("name", "description"):
+                field_filter = getattr(filters, field)
+                if field_filter and field_filter.contains:
+                    for term in field_filter.contains:
+                        term = term.strip()
+                        if term:
+                            has_condition = True
+                            matches |= self._match_term(field, term)
+
+            for field in ("quantity", "price"):
+                numeric_filter = getattr(filters, field)
+                if not numeric_filter:
+                    continue
+                lt = numeric_filter.lt if numeric_filter.lt is not None and numeric_filter.lt > 0 else None
+                gt = numeric_filter.gt if numeric_filter.gt is not None and numeric_filter.gt > 0 else None
+                if lt is None and gt is None:
+                    continue
+                has_condition = True
+                matches.update(self._numeric[field].between(gt, lt))
+
+            if not has_condition:
+                return set(self.products)
+            return matches
+
+    def search(self, filters: ProductFilters, limit: Optional[int] = None) -> List[ProductResponse]:
+        """
+        Products matching the filters, served straight from memory
+
+        Ordered by (name, id) like ProductRepository.get_with_filters orders
+        equally relevant rows, so a truncated result is the same subset every time.
+        """
+        ids = self.search_ids(filters)
+        with self._lock:
+            results = [self.products[product_id] for product_id in ids if product_id in self.products]
+        if limit is not None and limit < len(results):
+            return heapq.nsmallest(limit, results, key=_sort_key)
+        return sorted(results, key=_sort_key)
+
+    def verify(self, products: Iterable) -> Dict[str, list]:
+        """Compare the index with the given ORM products (normally the full table)"""
+        expected = {}
+        for product in products:
+            response = ProductResponse.model_validate(product)
+            expected[response.id] = response
+        with self._lock:
+            indexed = dict(self.products)
+        return {
+            "missing": [str(product_id) for product_id in expected.keys() - indexed.keys()],
+            "extra": [str(product_id) for product_id in indexed.keys() - expected.keys()],
+            "stale": [
+                str(product_id) for product_id in expected.keys() & indexed.keys()
+                if expected[product_id] != indexed[product_id]
+            ],
+        }
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index structures"""
+        with self._lock:
+            total = sys.getsizeof(self.products) + sys.getsizeof(self._versions)
+            total += sum(sys.getsizeof(product) + sys.getsizeof(product.__dict__) for product in self.products.values())
+            for field in ("name", "description"):
+                texts = self._text[field]
+                total += sys.getsizeof(texts) + sum(sys.getsizeof(value) for value in texts.values())
+                postings = self._postings[field]
+                total += sys.getsizeof(postings)
+                total += sum(sys.getsizeof(key) + sys.getsizeof(ids) for key, ids in postings.items())
+            for column in self._numeric.values():
+                total += sys.getsizeof(column.values) + sys.getsizeof(column.ids)
+            return total
+
+    def stats(self) -> Dict[str, float]:
+        products = len(self.products)
+        memory = self.memory_bytes()
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "products": products,
+            "name_trigrams": len(self._postings["name"]),
+            "description_trigrams": len(self._postings["description"]),
+            "memory_bytes": memory,
+            "bytes_per_product": round(memory / products, 1) if products else 0.0,
+        }
+
+
+product_index = ProductIndex()
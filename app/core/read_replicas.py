@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.engine import Engine, make_url
+from app.models import CatalogVersion
+
+# Cookie holding the epoch time until which a client that just wrote reads from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+class RequestRouting:
+    """Read routing state of one request - set by the read_your_writes middleware"""
+
+    __slots__ = ("sticky", "wrote")
+
+    def __init__(self, sticky: bool = False):
+        self.sticky = sticky  # the client wrote recently, read from the primary
+        self.wrote = False  # this request committed on the primary
+
+    @staticmethod
+    def from_cookie(value: Optional[str]) -> "RequestRouting":
+        try:
+            return RequestRouting(sticky=float(value) > time.time()) if value else RequestRouting()
+        except ValueError:
+            return RequestRouting()
+
+
+current_request_routing: ContextVar[Optional[RequestRouting]] = ContextVar("current_request_routing", default=None)
+
+
+def mark_write(connection):
+    """Engine "commit" listener of the primary - flags the current request as a writer"""
+    routing = current_request_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+class Replica:
+    """One read replica - its engines, session factories and last health check"""
+
+    def __init__(self, url: str, engine: Engine, session_factory, async_engine=None, async_session_factory=None):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_engine = async_engine
+        self.async_session_factory = async_session_factory
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.versions_behind: Optional[int] = None
+        self.lag_seconds: Optional[float] = None
+        self.reads = 0
+
+
+class ReplicaRouter:
+    """
+    Round-robin over the healthy read replicas, falling back to the primary
+
+    Health is checked by reading the catalog version row from the primary and
+    every replica. Lag is the time since a check first saw the primary past the
+    replica's version, so it resolves to check_interval and is not confused by
+    a write after an idle period. A replica that errors, lacks the schema or
+    lags more than max_lag_seconds is taken out of rotation until a later check
+    passes. The check works the same for PostgreSQL streaming replicas and for
+    plain copies of a SQLite file.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Replica], check_interval: float, max_lag_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.max_lag_seconds = max_lag_seconds
+        self._cycle = itertools.count()
+        # (primary catalog version, monotonic time it was observed), oldest first
+        self._primary_seen = deque(maxlen=math.ceil(max_lag_seconds / max(check_interval, 0.001)) + 2)
+        self.primary_reads = 0
+        self.sticky_reads = 0
+
+    def pick(self) -> Optional[Replica]:
+        """Replica for the next read, or None to read from the primary"""
+        if not self.replicas:
+            return None
+        routing = current_request_routing.get()
+        if routing is not None and routing.sticky:
+            self.sticky_reads += 1
+            return None
+        start = next(self._cycle)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                replica.reads += 1
+                return replica
+        self.primary_reads += 1
+        return None
+
+    @staticmethod
+    def _catalog_version(engine: Engine) -> int:
+        with engine.connect() as connection:
+            version = connection.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+        if version is None:
+            raise RuntimeError("catalog_version row is missing")
+        return version
+
+    def _lag(self, version: int, now: float) -> float:
+        """Seconds since a check first saw the primary beyond `version` (0 when caught up)"""
+        for seen_version, seen_at in self._primary_seen:
+            if seen_version > version:
+                return now - seen_at
+        return 0.0
+
+    def check(self):
+        """Check every replica once - blocking, see run_health_checks"""
+        now = time.monotonic()
+        try:
+            primary = self._catalog_version(self.primary)
+            self._primary_seen.append((primary, now))
+        except Exception:
+            primary = None  # lag is unknown while the primary is down, reachability is still checked
+        for replica in self.replicas:
+            try:
+                version = self._catalog_version(replica.engine)
+                replica.versions_behind, replica.lag_seconds = None, None
+                if primary is not None:
+                    replica.versions_behind = max(primary - version, 0)
+                    replica.lag_seconds = round(self._lag(version, now), 3)
+                if replica.lag_seconds is not None and replica.lag_seconds > self.max_lag_seconds:
+                    raise RuntimeError(f"{replica.lag_seconds:.1f}s behind the primary")
+                replica.healthy, replica.last_error = True, None
+            except Exception as e:
+                replica.healthy, replica.last_error = False, str(e).splitlines()[0]
+            replica.checked_at = time.time()
+
+    async def run_health_checks(self):
+        """Re-check the replicas every check_interval seconds - run as a task by the app lifespan"""
+        while True:
+            await asyncio.to_thread(self.check)
+            await asyncio.sleep(self.check_interval)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "reads": replica.reads,
+                    "versions_behind": replica.versions_behind,
+                    "lag_seconds": replica.lag_seconds,
+                    "last_error": replica.last_error,
+                    "checked_at": replica.checked_at,
+                }
+                for replica in self.replicas
+            ],
+            "primary_fallback_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+        }
@@ -0,0 +1,127 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.config.settings import settings
+
+# like    - plain ILIKE '%term%' predicates (sequential scan, any database)
+# pg_trgm - ILIKE served by trigram GIN indexes, ranked by word_similarity
+# fts5    - SQLite FTS5 trigram table kept in sync by triggers, ranked by bm25
+TEXT_SEARCH_BACKENDS = ("auto", "like", "pg_trgm", "fts5")
+
+# Shortest term a trigram index can serve - shorter terms fall back to ILIKE
+MIN_TRIGRAM_TERM = 3
+
+# Stable integer key per product for the FTS5 rowid. The implicit products.rowid
+# cannot serve - products has a UUID primary key, so VACUUM may renumber it
+_FTS5_KEYS_TABLE = """CREATE TABLE IF NOT EXISTS product_search_keys (
+        key INTEGER PRIMARY KEY, product_id CHAR(32) NOT NULL UNIQUE
+    )"""
+
+# Contentless - the triggers pass the old values along with each 'delete'
+_FTS5_TABLE = """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, content='', tokenize='trigram'
+    )"""
+
+_FTS5_KEY_OF_OLD = "(SELECT key FROM product_search_keys WHERE product_id = old.id)"
+_FTS5_KEY_OF_NEW = "(SELECT key FROM product_search_keys WHERE product_id = new.id)"
+
+_FTS5_INSERT_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO product_search_keys(product_id) VALUES (new.id);
+        INSERT INTO products_fts(rowid, name, description) VALUES ({_FTS5_KEY_OF_NEW}, new.name, new.description);
+    END"""
+
+_FTS5_DELETE_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', {_FTS5_KEY_OF_OLD}, old.name, old.description);
+        DELETE FROM product_search_keys WHERE product_id = old.id;
+    END"""
+
+_FTS5_UPDATE_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', {_FTS5_KEY_OF_OLD}, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description) VALUES ({_FTS5_KEY_OF_NEW}, new.name, new.description);
+    END"""
+
+_FTS5_STATEMENTS = [_FTS5_KEYS_TABLE, _FTS5_TABLE, _FTS5_INSERT_TRIGGER, _FTS5_DELETE_TRIGGER, _FTS5_UPDATE_TRIGGER]
+
+_PG_TRGM_STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_description_trgm ON products USING gin (description gin_trgm_ops)",
+]
+
+
+def get_search_backend(dialect_name: str) -> str:
+    """Resolve settings.search_backend for the given SQLAlchemy dialect"""
+    backend = settings.search_backend
+    if backend not in TEXT_SEARCH_BACKENDS:
+        raise ValueError(f"Unknown search backend '{backend}', expected one of {TEXT_SEARCH_BACKENDS}")
+    if backend == "auto":
+        return {"postgresql": "pg_trgm", "sqlite": "fts5"}.get(dialect_name, "like")
+    return backend
+
+
+def fts5_match_expression(terms) -> str:
+    """Build an FTS5 MATCH expression OR-ing column-scoped, quoted (column, term) pairs"""
+    return " OR ".join(
+        '{0} : "{1}"'.format(column, term.replace('"', '""'))
+        for column, term in terms
+    )
+
+
+def index_fts5_keys_after(db, max_key: int):
+    """Index the products whose search key is above max_key - see suspend_fts5_insert_trigger"""
+    db.execute(text(
+        "INSERT INTO products_fts(rowid, name, description) "
+        "SELECT k.key, p.name, p.description FROM product_search_keys k "
+        "JOIN products p ON p.id = k.product_id WHERE k.key > :max_key"
+    ), {"max_key": max_key})
+
+
+def suspend_fts5_insert_trigger(db):
+    """
+    Drop the per-row FTS5 insert trigger inside the caller's transaction
+    
+    Indexing new rows one by one through the trigger is several times slower
+    than one INSERT ... SELECT into products_fts, so bulk loads suspend it,
+    add the rows to product_search_keys and index them themselves (see
+    index_fts5_keys_after), then call restore_fts5_insert_trigger before committing.
+    SQLite DDL is transactional: other connections never see the triggers
+    missing, and a rollback brings them back. The transaction must already have
+    started (a write was issued), or pysqlite would autocommit the DROP.
+    """
+    db.execute(text("DROP TRIGGER IF EXISTS products_fts_insert"))
+
+
+def restore_fts5_insert_trigger(db):
+    """Re-create the trigger removed by suspend_fts5_insert_trigger"""
+    db.execute(text(_FTS5_INSERT_TRIGGER))
+
+
+def setup_text_search(engine: Engine):
+    """
+    Create the indexes / virtual tables the configured text-search backend needs
+
+    Safe to run on every startup. A freshly created FTS5 table is populated from
+    the existing rows; afterwards triggers keep it in sync with products. An
+    FTS5 table from before product_search_keys (keyed on products.rowid) is
+    dropped and rebuilt.
+    """
+    backend = get_search_backend(engine.dialect.name)
+
+    with engine.begin() as conn:
+        if backend == "pg_trgm":
+            for statement in _PG_TRGM_STATEMENTS:
+                conn.execute(text(statement))
+        elif backend == "fts5":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'product_search_keys'")
+            ).first()
+            if not exists:
+                for trigger in ("products_fts_insert", "products_fts_delete", "products_fts_update"):
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+                conn.execute(text("DROP TABLE IF EXISTS products_fts"))
+            for statement in _FTS5_STATEMENTS:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text("INSERT INTO product_search_keys(product_id) SELECT id FROM products"))
+                index_fts5_keys_after(conn, 0)
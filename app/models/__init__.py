@@ -1,5 +1,9 @@
 # SQLAlchemy models
 from .product import Product, Base
+from .catalog import CatalogVersion
+from .analytics import InventoryAggregate
+from .change_log import ProductChange, ChangeLogHorizon
+from .product_import import ProductImport, ProductImportError
 
 # Pydantic schemas
 from .schemas import (
@@ -9,14 +13,41 @@ from .schemas import (
     ProductBase,
     ProductCreate,
     ProductUpdate,
+    ProductBulkUpdate,
+    ProductBulkDelete,
     ProductResponse,
     ProductListResponse,
+    BulkItemError,
+    BulkOperationResponse,
+    StockAdjustment,
+    ProductStockAdjustment,
+    StockAdjustmentError,
+    StockAdjustmentResponse,
+    ImportRowError,
+    ImportJobResponse,
+    ImportErrorReport,
+    HistogramBucket,
+    InventoryStatsResponse,
+    AggregateMismatch,
+    InventoryStatsVerifyResponse,
+    ProductChangeEntry,
+    ProductChangesResponse,
+    ChangeLogCompactionResponse,
+    ProductQueryBatch,
+    ProductSearchResult,
+    ProductSearchBatchResponse,
     ErrorResponse
 )
 
 __all__ = [
     # SQLAlchemy
     "Product",
+    "CatalogVersion",
+    "InventoryAggregate",
+    "ProductChange",
+    "ChangeLogHorizon",
+    "ProductImport",
+    "ProductImportError",
     "Base",
     
     # Pydantic schemas
@@ -26,7 +57,28 @@ __all__ = [
     "ProductBase",
     "ProductCreate",
     "ProductUpdate",
+    "ProductBulkUpdate",
+    "ProductBulkDelete",
     "ProductResponse",
     "ProductListResponse",
+    "BulkItemError",
+    "BulkOperationResponse",
+    "StockAdjustment",
+    "ProductStockAdjustment",
+    "StockAdjustmentError",
+    "StockAdjustmentResponse",
+    "ImportRowError",
+    "ImportJobResponse",
+    "ImportErrorReport",
+    "HistogramBucket",
+    "InventoryStatsResponse",
+    "AggregateMismatch",
+    "InventoryStatsVerifyResponse",
+    "ProductChangeEntry",
+    "ProductChangesResponse",
+    "ChangeLogCompactionResponse",
+    "ProductQueryBatch",
+    "ProductSearchResult",
+    "ProductSearchBatchResponse",
     "ErrorResponse"
 ]
\ No newline at end of file
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Float, String
+from .product import Base
+
+
+class InventoryAggregate(Base):
+    """One named running total of the inventory analytics (see app.core.analytics)"""
+    __tablename__ = "inventory_aggregates"
+    
+    key = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0)
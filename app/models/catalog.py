@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from .product import Base
+
+
+class CatalogVersion(Base):
+    """Single-row table holding a counter bumped by every product write"""
+    __tablename__ = "catalog_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)  # naive UTC
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, Index, String, Uuid
+from .product import Base
+
+
+class ProductChange(Base):
+    """
+    One entry of the append-only product change log
+    
+    Written in the same transaction as the product write it records, after
+    that transaction has bumped the catalog version - every writer queues on
+    that row lock, so seq order is also commit order and a reader never sees
+    a later seq before an earlier one.
+    """
+    __tablename__ = "product_changes"
+    
+    # INTEGER PRIMARY KEY on SQLite, where only that type autoincrements
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    product_id = Column(Uuid(as_uuid=True), nullable=False)
+    op = Column(String(6), nullable=False)  # upsert | delete
+    changed_at = Column(DateTime, nullable=False)  # naive UTC
+    
+    __table_args__ = (
+        # Latest entry per product, for compaction
+        Index("ix_product_changes_product_id_seq", "product_id", "seq"),
+        Index("ix_product_changes_op_changed_at", "op", "changed_at"),
+    )
+
+
+class ChangeLogHorizon(Base):
+    """Single-row table holding the highest seq of a tombstone removed by compaction"""
+    __tablename__ = "change_log_horizon"
+    
+    id = Column(Integer, primary_key=True)
+    compacted_through = Column(BigInteger, nullable=False, default=0)
+    compacted_at = Column(DateTime)  # naive UTC
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, Float, Index, Uuid
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 
@@ -9,8 +8,17 @@ Base = declarative_base()
 class Product(Base):
     __tablename__ = "products"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    # Generic Uuid: native UUID on PostgreSQL, CHAR(32) elsewhere. A bare UUID
+    # column has NUMERIC affinity on SQLite, which stores all-digit hex ids as REAL
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String, index=True)
     price = Column(Float)
     description = Column(String)
     quantity = Column(Integer)
+    
+    # Composite (sort_key, id) indexes backing keyset pagination
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_quantity_id", "quantity", "id"),
+    )
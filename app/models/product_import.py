@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, BigInteger, Boolean, DateTime, String, Uuid
+from .product import Base
+
+
+class ProductImport(Base):
+    """
+    Status and counters of one /products/import job
+
+    Kept in the database rather than in the worker running the job, so any
+    worker can report on it and it survives a restart.
+    """
+    __tablename__ = "product_imports"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True)
+    status = Column(String(9), nullable=False)  # queued | running | succeeded | failed
+    format = Column(String(6), nullable=False)  # csv | ndjson
+    upsert_by_name = Column(Boolean, nullable=False, default=False)
+    bytes_total = Column(BigInteger, nullable=False, default=0)
+    bytes_read = Column(BigInteger, nullable=False, default=0)
+    rows_read = Column(Integer, nullable=False, default=0)
+    created = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    queued_at = Column(DateTime, nullable=False, index=True)  # naive UTC
+    started_at = Column(DateTime)  # naive UTC
+    finished_at = Column(DateTime)  # naive UTC
+
+
+class ProductImportError(Base):
+    """A rejected row of an import job - at most settings.import_max_errors per job"""
+    __tablename__ = "product_import_errors"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    line = Column(Integer, nullable=False)
+    error = Column(String, nullable=False)
+    row = Column(String)
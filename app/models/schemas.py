@@ -1,6 +1,8 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from uuid import UUID
+from app.config.settings import settings
 
 
 class ProductFilter(BaseModel):
@@ -42,6 +44,16 @@ class ProductUpdate(BaseModel):
     quantity: Optional[int] = None
 
 
+class ProductBulkUpdate(ProductUpdate):
+    """Schema for one item of a bulk update - UUID plus the fields to change"""
+    id: UUID
+
+
+class ProductBulkDelete(BaseModel):
+    """Schema for bulk deletes"""
+    ids: List[UUID] = Field(..., max_length=settings.bulk_max_items)
+
+
 class ProductResponse(ProductBase):
     """Schema for product responses - includes UUID"""
     id: UUID
@@ -53,6 +65,133 @@ class ProductResponse(ProductBase):
 class ProductListResponse(BaseModel):
     products: list[ProductResponse]
     count: int
+    next_cursor: Optional[str] = None
+
+
+class BulkItemError(BaseModel):
+    """Error for a single item of a bulk request - index is its position in the request"""
+    index: int
+    id: Optional[UUID] = None
+    error: str
+
+
+class BulkOperationResponse(BaseModel):
+    products: list[ProductResponse] = []
+    deleted_ids: list[UUID] = []
+    succeeded: int
+    failed: int
+    errors: list[BulkItemError] = []
+
+
+class StockAdjustment(BaseModel):
+    """Quantity change - negative reserves / sells stock, positive restocks"""
+    delta: int
+
+
+class ProductStockAdjustment(StockAdjustment):
+    """One item of a batch stock adjustment"""
+    id: UUID
+
+
+class StockAdjustmentError(BulkItemError):
+    """A stock adjustment that was not applied - available is None when the product does not exist"""
+    available: Optional[int] = None
+
+
+class StockAdjustmentResponse(BaseModel):
+    """Outcome of a batch stock adjustment - an atomic batch applies nothing unless every item fits"""
+    products: list[ProductResponse] = []
+    succeeded: int
+    failed: int
+    errors: list[StockAdjustmentError] = []
+
+
+class ImportRowError(BaseModel):
+    """A rejected row of an import - line is its line number in the uploaded file"""
+    line: int
+    error: str
+    row: Optional[str] = None
+
+
+class ImportJobResponse(BaseModel):
+    """Progress and outcome of a background product import"""
+    id: UUID
+    status: str
+    format: str
+    upsert_by_name: bool
+    bytes_total: int
+    bytes_read: int
+    progress: float
+    rows_read: int
+    created: int
+    updated: int
+    rejected: int
+    rows_per_sec: float
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class ImportErrorReport(BaseModel):
+    """Rejected rows of an import - truncated once settings.import_max_errors are kept"""
+    job_id: UUID
+    rejected: int
+    truncated: bool
+    errors: list[ImportRowError]
+
+
+class HistogramBucket(BaseModel):
+    """Products whose value falls in one histogram bucket"""
+    bucket: str
+    count: int
+
+
+class InventoryStatsResponse(BaseModel):
+    """Dashboard totals read from the incrementally maintained inventory aggregates"""
+    total_skus: int
+    total_units: int
+    inventory_value: float
+    low_stock_count: int
+    low_stock_threshold: int
+    price_histogram: List[HistogramBucket]
+    quantity_histogram: List[HistogramBucket]
+
+
+class AggregateMismatch(BaseModel):
+    """A stored aggregate that differs from a full recompute"""
+    key: str
+    stored: Optional[float] = None
+    actual: float
+
+
+class InventoryStatsVerifyResponse(BaseModel):
+    """Stored aggregates compared with a full recompute - repaired when asked to"""
+    consistent: bool
+    mismatches: List[AggregateMismatch]
+    repaired: bool
+
+
+class ProductChangeEntry(BaseModel):
+    """A change of one product - product holds its current state for an upsert and is None for a tombstone"""
+    seq: int
+    op: str  # upsert | delete
+    id: UUID
+    changed_at: datetime
+    product: Optional[ProductResponse] = None
+
+
+class ProductChangesResponse(BaseModel):
+    """One page of the change feed - pass next_since as since to read the next one"""
+    changes: list[ProductChangeEntry]
+    next_since: int
+    has_more: bool
+
+
+class ChangeLogCompactionResponse(BaseModel):
+    """Entries removed by a change log compaction"""
+    superseded: int
+    tombstones: int
+    compacted_through: int
 
 
 class ProductQuery(BaseModel):
@@ -60,6 +199,26 @@ class ProductQuery(BaseModel):
     user_query: str
 
 
+class ProductQueryBatch(BaseModel):
+    """Schema for batch AI product search - each query is answered independently"""
+    user_queries: List[str] = Field(..., min_length=1, max_length=settings.ai_batch_max_queries)
+
+
+class ProductSearchResult(BaseModel):
+    """One query of a batch AI search - error is set instead of products when it failed"""
+    user_query: str
+    products: list[ProductResponse] = []
+    count: int = 0
+    error: Optional[str] = None
+
+
+class ProductSearchBatchResponse(BaseModel):
+    """Results in request order - queries equal after normalization share one translation and one query"""
+    results: list[ProductSearchResult]
+    unique_queries: int
+    failed: int
+
+
 class ErrorResponse(BaseModel):
     error: str
     message: str
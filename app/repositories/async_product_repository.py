@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Product
+from app.models.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductBulkUpdate,
+    ProductFilters,
+    BulkItemError,
+    ProductStockAdjustment,
+    StockAdjustmentError
+)
+from app.repositories.product_repository import ProductRepository
+from uuid import UUID
+
+
+class AsyncProductRepository:
+    """Async repository layer for product data access operations
+
+    Each call runs the matching ProductRepository method through
+    AsyncSession.run_sync, so the statements go out on the asyncio driver
+    (asyncpg / aiosqlite) and the event loop is free while they run. Query
+    logic and error handling stay in one place.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args):
+        """Run a ProductRepository method on the sync view of the async session"""
+        return await self.db.run_sync(
+            lambda session: getattr(ProductRepository(session), method)(*args)
+        )
+
+    async def get_catalog_version(self) -> Optional[Tuple[int, datetime]]:
+        """Current (version, updated_at) of the catalog"""
+        return await self._run("get_catalog_version")
+
+    async def get_all(self) -> List[Product]:
+        """Retrieve all products from the database"""
+        return await self._run("get_all")
+
+    async def get_all_rows(self) -> List[Row]:
+        """Retrieve all products as plain column rows"""
+        return await self._run("get_all_rows")
+
+    async def get_page(
+        self,
+        limit: int,
+        sort_by: str = "name",
+        order: str = "asc",
+        after: Optional[Tuple[Any, UUID]] = None,
+        as_rows: bool = False
+    ) -> List[Product]:
+        """Retrieve one page of products ordered by (sort_by, id) using keyset pagination"""
+        return await self._run("get_page", limit, sort_by, order, after, as_rows)
+
+    async def get_by_id(self, product_id: UUID) -> Optional[Product]:
+        """Retrieve a product by its UUID"""
+        return await self._run("get_by_id", product_id)
+
+    async def create(self, product_data: ProductCreate) -> Product:
+        """Create a new product in the database"""
+        return await self._run("create", product_data)
+
+    async def update(self, product_id: UUID, product_data: ProductUpdate) -> Optional[Product]:
+        """Update an existing product in the database"""
+        return await self._run("update", product_id, product_data)
+
+    async def delete(self, product_id: UUID) -> bool:
+        """Delete a product from the database"""
+        return await self._run("delete", product_id)
+
+    async def bulk_create(self, products_data: List[ProductCreate]) -> Tuple[List[Product], List[BulkItemError]]:
+        """Create many products with batched multi-row INSERT ... RETURNING"""
+        return await self._run("bulk_create", products_data)
+
+    async def bulk_update(self, products_data: List[ProductBulkUpdate]) -> Tuple[List[Product], List[BulkItemError]]:
+        """Update many products by UUID with batched executemany UPDATEs"""
+        return await self._run("bulk_update", products_data)
+
+    async def bulk_delete(self, product_ids: List[UUID]) -> Tuple[List[UUID], List[BulkItemError]]:
+        """Delete many products with batched DELETE ... WHERE id IN (...)"""
+        return await self._run("bulk_delete", product_ids)
+
+    async def adjust_stock(
+        self,
+        adjustments: List[ProductStockAdjustment],
+        atomic: bool = True
+    ) -> Tuple[List[Product], List[StockAdjustmentError]]:
+        """Apply quantity deltas with one conditional UPDATE per product"""
+        return await self._run("adjust_stock", adjustments, atomic)
+
+    async def get_changes(self, since: int, limit: int) -> Tuple[List[Row], Dict[UUID, Row], bool]:
+        """Change log entries after seq `since` with the current rows of their upserted products"""
+        return await self._run("get_changes", since, limit)
+
+    async def get_change_horizon(self) -> int:
+        """Highest seq of a tombstone removed by compaction"""
+        return await self._run("get_change_horizon")
+
+    async def get_with_filters(self, filters: ProductFilters, limit: Optional[int] = None) -> List[Product]:
+        """Retrieve products with AI-generated filters, ordered by relevance"""
+        return await self._run("get_with_filters", filters, limit)
+
+    async def count(self) -> int:
+        """Count the total number of products"""
+        return await self._run("count")
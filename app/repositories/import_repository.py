@@ -0,0 +1,72 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import delete, insert, select, update
+from app.models import ProductImport, ProductImportError
+from app.models.schemas import ImportRowError
+from uuid import UUID
+
+
+class ImportJobRepository:
+    """Repository layer for import job status and rejected rows"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, fields: dict) -> None:
+        """Record a new import job"""
+        try:
+            self.db.execute(insert(ProductImport.__table__), fields)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error creating import job: {str(e)}")
+
+    def save(self, job_id: UUID, fields: dict, errors: List[ImportRowError]) -> None:
+        """Update a job's status and counters and append rejected rows, in one transaction"""
+        try:
+            jobs = ProductImport.__table__
+            self.db.execute(update(jobs).where(jobs.c.id == job_id).values(**fields))
+            if errors:
+                self.db.execute(
+                    insert(ProductImportError.__table__),
+                    [{"job_id": job_id, **error.model_dump()} for error in errors]
+                )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error saving import job: {str(e)}")
+
+    def get(self, job_id: UUID) -> Optional[ProductImport]:
+        """Retrieve an import job by its UUID"""
+        try:
+            return self.db.get(ProductImport, job_id)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving import job: {str(e)}")
+
+    def get_errors(self, job_id: UUID) -> List[ProductImportError]:
+        """Rejected rows of an import job in the order they were found"""
+        try:
+            return self.db.scalars(
+                select(ProductImportError).where(ProductImportError.job_id == job_id).order_by(ProductImportError.id)
+            ).all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving import errors: {str(e)}")
+
+    def prune(self, keep: int) -> int:
+        """Delete finished jobs (and their rejected rows) beyond the newest `keep` - returns how many went"""
+        try:
+            expired = self.db.scalars(
+                select(ProductImport.id)
+                .where(ProductImport.status.in_(("succeeded", "failed")))
+                .order_by(ProductImport.queued_at.desc())
+                .offset(keep)
+            ).all()
+            if expired:
+                self.db.execute(delete(ProductImportError.__table__).where(ProductImportError.job_id.in_(expired)))
+                self.db.execute(delete(ProductImport.__table__).where(ProductImport.id.in_(expired)))
+            self.db.commit()
+            return len(expired)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error pruning import jobs: {str(e)}")
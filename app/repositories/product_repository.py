@@ -1,10 +1,38 @@
-from typing import List, Optional
+import csv
+import io
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import or_
-from app.models import Product, Base
-from app.models.schemas import ProductCreate, ProductUpdate, ProductFilters
-from uuid import UUID
+from sqlalchemy import Float, Integer, Uuid, and_, bindparam, case, column, delete, func, insert, literal_column, or_, select, table, text, tuple_, update
+from sqlalchemy.engine import Row
+from app.config.settings import settings
+from app.utils.batching import chunked
+from app.core.analytics import HISTOGRAMS, TOTAL_KEYS, aggregate_keys, bucket_expression, contribution, net_deltas
+from app.core.product_index import product_index
+from app.core.search import (
+    MIN_TRIGRAM_TERM,
+    fts5_match_expression,
+    get_search_backend,
+    index_fts5_keys_after,
+    restore_fts5_insert_trigger,
+    suspend_fts5_insert_trigger
+)
+from app.models import Product, CatalogVersion, InventoryAggregate, ProductChange, ChangeLogHorizon, Base
+from app.models.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductBulkUpdate,
+    ProductFilters,
+    BulkItemError,
+    ProductStockAdjustment,
+    StockAdjustmentError
+)
+from uuid import UUID, uuid4
+
+# Integer keys of the products in the FTS5 table (see app.core.search)
+PRODUCT_SEARCH_KEYS = table("product_search_keys", column("key", Integer), column("product_id", Uuid(as_uuid=True)))
 
 
 class ProductRepository:
@@ -14,6 +42,235 @@ class ProductRepository:
         self.db = db
         self.model = Product
     
+    def touch_catalog(self) -> Optional[int]:
+        """
+        Bump the catalog version inside the current transaction and return it
+        
+        Called by every write path right before it commits, so the version (used
+        for ETag / Last-Modified) changes atomically with the data. The row lock
+        orders writers, so versions follow commit order - product_index uses
+        them to drop updates that arrive out of order. It also caps write
+        throughput at one transaction at a time (see "Write throughput" in the
+        README).
+        """
+        # Core UPDATE on the table - no ORM bulk-update bookkeeping on every write
+        catalog = CatalogVersion.__table__
+        statement = (
+            update(catalog)
+            .where(catalog.c.id == 1)
+            .values(version=catalog.c.version + 1, updated_at=datetime.now(timezone.utc).replace(tzinfo=None))
+        )
+        if self.db.get_bind().dialect.update_returning:
+            return self.db.scalar(statement.returning(catalog.c.version))
+        self.db.execute(statement)
+        return self.db.scalar(select(catalog.c.version).where(catalog.c.id == 1))
+    
+    def get_catalog_version(self) -> Optional[Tuple[int, datetime]]:
+        """Current (version, updated_at) of the catalog, or None before init_db has run"""
+        try:
+            row = self.db.execute(
+                select(CatalogVersion.version, CatalogVersion.updated_at).where(CatalogVersion.id == 1)
+            ).first()
+            return (row.version, row.updated_at) if row else None
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving catalog version: {str(e)}")
+    
+    def adjust_inventory_stats(self, deltas: Counter):
+        """
+        Add aggregate deltas (see app.core.analytics) inside the current transaction
+        
+        Called after touch_catalog by every write path, so the analytics commit
+        atomically with the rows they describe. Keys are updated in sorted order
+        to keep the lock order the same for every writer.
+        """
+        params = [{"b_key": key, "b_delta": delta} for key, delta in sorted(deltas.items()) if delta]
+        if params:
+            aggregates = InventoryAggregate.__table__
+            self.db.execute(
+                update(aggregates)
+                .where(aggregates.c.key == bindparam("b_key"))
+                .values(value=aggregates.c.value + bindparam("b_delta")),
+                params
+            )
+    
+    def get_inventory_stats(self) -> Dict[str, float]:
+        """Stored aggregates by key - a fixed number of rows whatever the catalog size"""
+        try:
+            return dict(self.db.execute(select(InventoryAggregate.key, InventoryAggregate.value)).all())
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving inventory stats: {str(e)}")
+    
+    def _scan_inventory_stats(self) -> Dict[str, float]:
+        price = func.coalesce(self.model.price, 0)
+        quantity = func.coalesce(self.model.quantity, 0)
+        totals = self.db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(quantity), 0),
+                func.coalesce(func.sum(price * quantity), 0),
+                func.coalesce(func.sum(case((quantity <= settings.low_stock_threshold, 1), else_=0)), 0)
+            ).select_from(self.model)
+        ).one()
+        values = dict.fromkeys(aggregate_keys(), 0)
+        values.update(zip(TOTAL_KEYS, totals))
+        for histogram in HISTOGRAMS:
+            # Bucket in a subquery - PostgreSQL will not match a GROUP BY CASE whose bound edges render twice
+            buckets = select(bucket_expression(histogram, getattr(self.model, histogram)).label("bucket")).subquery()
+            values.update(self.db.execute(select(buckets.c.bucket, func.count()).group_by(buckets.c.bucket)).all())
+        return values
+    
+    def compute_inventory_stats(self) -> Dict[str, float]:
+        """Aggregates recomputed with a full scan of products - used to verify the stored ones"""
+        try:
+            return self._scan_inventory_stats()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error computing inventory stats: {str(e)}")
+    
+    def recompute_inventory_stats(self) -> Dict[str, float]:
+        """
+        Overwrite the stored aggregates with a full scan, in one transaction
+        
+        touch_catalog goes first: every product writer takes that lock before it
+        adjusts the aggregates, so none can land between the scan and the
+        overwrite. Rows are updated in place rather than deleted and re-inserted,
+        so a writer queued on one still adds its delta to the new value.
+        """
+        try:
+            self.touch_catalog()
+            values = self._scan_inventory_stats()
+            aggregates = InventoryAggregate.__table__
+            stored = set(self.db.scalars(select(aggregates.c.key)))
+            current = [{"b_key": key, "b_value": value} for key, value in values.items() if key in stored]
+            if current:
+                self.db.execute(
+                    update(aggregates).where(aggregates.c.key == bindparam("b_key")).values(value=bindparam("b_value")),
+                    current
+                )
+            missing = [{"key": key, "value": value} for key, value in values.items() if key not in stored]
+            if missing:
+                self.db.execute(insert(aggregates), missing)
+            # Buckets of edges that are no longer configured
+            if stored - set(values):
+                self.db.execute(delete(aggregates).where(aggregates.c.key.in_(stored - set(values))))
+            self.db.commit()
+            return values
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error recomputing inventory stats: {str(e)}")
+    
+    def log_changes(self, product_ids: Iterable[UUID], op: str = "upsert"):
+        """
+        Append change log entries (see ProductChange) inside the current transaction
+        
+        Called after touch_catalog by every write path, so the entries commit
+        atomically with the write and get their seq in commit order.
+        """
+        changed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows = [{"product_id": product_id, "op": op, "changed_at": changed_at} for product_id in product_ids]
+        if rows:
+            self.db.execute(insert(ProductChange.__table__), rows)
+    
+    def get_changes(self, since: int, limit: int) -> Tuple[List[Row], Dict[UUID, Row], bool]:
+        """
+        Change log entries after seq `since`, the current rows of their upserted products, and whether more follow
+        
+        Entries are read by primary key range and products by id, so a sync
+        costs the number of changes rather than the catalog size.
+        """
+        try:
+            changes = ProductChange.__table__
+            entries = self.db.execute(
+                select(changes.c.seq, changes.c.product_id, changes.c.op, changes.c.changed_at)
+                .where(changes.c.seq > since)
+                .order_by(changes.c.seq)
+                .limit(limit + 1)
+            ).all()
+            has_more = len(entries) > limit
+            entries = entries[:limit]
+            upserted = list({entry.product_id for entry in entries if entry.op == "upsert"})
+            rows = {}
+            if upserted:
+                rows = {row.id: row for row in self.db.execute(select(*self.columns()).where(self.model.id.in_(upserted)))}
+            return entries, rows, has_more
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving product changes: {str(e)}")
+    
+    def get_change_head(self) -> int:
+        """Seq of the newest change log entry - 0 when the log is empty"""
+        try:
+            return self.db.scalar(select(func.max(ProductChange.seq))) or 0
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving change log head: {str(e)}")
+    
+    def get_change_horizon(self) -> int:
+        """Highest seq of a tombstone removed by compaction - 0 when none has been"""
+        try:
+            return self.db.scalar(select(ChangeLogHorizon.compacted_through).where(ChangeLogHorizon.id == 1)) or 0
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving change log horizon: {str(e)}")
+    
+    def backfill_changes(self) -> int:
+        """
+        Log an upsert for every product when the change log is empty but the catalog is not
+        
+        Run by init_db, so a catalog that predates the change log (or was seeded
+        without it) can still be bootstrapped from since=0.
+        """
+        try:
+            changes = ProductChange.__table__
+            if self.db.scalar(select(changes.c.seq).limit(1)) is not None:
+                return 0
+            self.touch_catalog()
+            changed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            result = self.db.execute(insert(changes).from_select(
+                ["product_id", "op", "changed_at"],
+                select(self.model.id, literal_column("'upsert'"), bindparam("changed_at", changed_at))
+            ))
+            self.db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error backfilling product changes: {str(e)}")
+    
+    def compact_changes(self, tombstone_retention_seconds: int) -> Tuple[int, int, int]:
+        """
+        Remove change log entries a sync no longer needs, in one transaction
+        
+        An entry followed by a later one for the same product goes: a client
+        that has not read it yet will read the later one and end up in the same
+        state. Tombstones older than the retention (0 keeps them) go as well, and
+        the highest seq among them becomes the horizon - a client whose cursor is
+        behind it may have missed deletes and has to resync from since=0.
+        Returns (superseded removed, tombstones removed, horizon).
+        """
+        try:
+            changes = ProductChange.__table__
+            later = changes.alias("later")
+            superseded = self.db.execute(
+                delete(changes).where(
+                    select(later.c.seq)
+                    .where(later.c.product_id == changes.c.product_id, later.c.seq > changes.c.seq)
+                    .exists()
+                )
+            ).rowcount
+            
+            tombstones = 0
+            horizon = self.db.get(ChangeLogHorizon, 1, with_for_update=True)
+            if tombstone_retention_seconds > 0:
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                expired = and_(changes.c.op == "delete", changes.c.changed_at < now - timedelta(seconds=tombstone_retention_seconds))
+                through = self.db.scalar(select(func.max(changes.c.seq)).where(expired))
+                if through is not None:
+                    tombstones = self.db.execute(delete(changes).where(expired, changes.c.seq <= through)).rowcount
+                    horizon.compacted_through = max(horizon.compacted_through, through)
+                    horizon.compacted_at = now
+            compacted_through = horizon.compacted_through
+            self.db.commit()
+            return superseded, tombstones, compacted_through
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error compacting product changes: {str(e)}")
+    
     def get_all(self) -> List[Product]:
         """Retrieve all products from the database"""
         try:
@@ -21,6 +278,84 @@ class ProductRepository:
         except SQLAlchemyError as e:
             raise Exception(f"Error retrieving products: {str(e)}")
     
+    def columns(self) -> tuple:
+        """Product columns selected by the row-returning (non-ORM) read paths"""
+        return (self.model.id, self.model.name, self.model.price, self.model.description, self.model.quantity)
+    
+    def get_all_rows(self) -> List[Row]:
+        """Retrieve all products as plain column rows - no ORM instances are hydrated"""
+        try:
+            return self.db.execute(select(*self.columns())).all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving products: {str(e)}")
+    
+    def iter_rows(self, batch_size: int = 1000) -> Iterator[Row]:
+        """
+        Stream every product as a plain column row
+        
+        Uses a server-side cursor (stream_results) and fetches `batch_size` rows at
+        a time, so memory stays bounded by the batch rather than the table size.
+        """
+        try:
+            statement = select(*self.columns()).execution_options(stream_results=True, yield_per=batch_size)
+            yield from self.db.execute(statement)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error streaming products: {str(e)}")
+    
+    def get_page(
+        self,
+        limit: int,
+        sort_by: str = "name",
+        order: str = "asc",
+        after: Optional[Tuple[Any, UUID]] = None,
+        as_rows: bool = False
+    ) -> List[Product]:
+        """
+        Retrieve one page of products ordered by (sort_by, id) using keyset pagination
+        
+        `after` is the (sort_value, id) of the last row of the previous page. Rows are
+        located through the (sort_by, id) index, so a deep page costs the same as the
+        first one. Fetches limit + 1 rows so the caller can tell if a next page exists.
+        With `as_rows` plain column rows are returned instead of ORM instances.
+        """
+        try:
+            sort_column = getattr(self.model, sort_by)
+            q = self.db.query(*self.columns()) if as_rows else self.db.query(self.model)
+            
+            if after is not None:
+                q = q.filter(self.keyset_after(sort_column, order, after))
+            
+            if order == "desc":
+                q = q.order_by(sort_column.desc(), self.model.id.desc())
+            else:
+                q = q.order_by(sort_column.asc(), self.model.id.asc())
+            
+            return q.limit(limit + 1).all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error retrieving products: {str(e)}")
+    
+    def keyset_after(self, sort_column, order: str, after: Tuple[Any, UUID]):
+        """
+        Condition for the rows after `after` in (sort_column, id) order
+        
+        The row value comparison matches the (sort_by, id) index but is never
+        true for a NULL sort key, so NULL rows are added explicitly on the side
+        the dialect sorts them to - PostgreSQL puts NULLs last in ascending
+        order, SQLite and MySQL first - and the order keeps using the index.
+        """
+        value, after_id = after
+        nulls_high = self.db.get_bind().dialect.name in ("postgresql", "oracle")
+        descending = order == "desc"
+        # NULL rows come before every other row of the page
+        nulls_first = nulls_high == descending
+        id_after = self.model.id < after_id if descending else self.model.id > after_id
+        if value is None:
+            condition = and_(sort_column.is_(None), id_after)
+            return or_(condition, sort_column.is_not(None)) if nulls_first else condition
+        position = tuple_(sort_column, self.model.id)
+        condition = position < tuple_(value, after_id) if descending else position > tuple_(value, after_id)
+        return condition if nulls_first else or_(condition, sort_column.is_(None))
+    
     def get_by_id(self, product_id: UUID) -> Optional[Product]:
         """Retrieve a product by its UUID"""
         try:
@@ -36,105 +371,525 @@ class ProductRepository:
             db_product = self.model(**product_data.model_dump())
             # UUID is auto-generated by database default
             self.db.add(db_product)
+            # Flush so the generated id is known for the change log
+            self.db.flush()
+            version = self.touch_catalog()
+            self.log_changes([db_product.id])
+            self.adjust_inventory_stats(contribution(db_product.price, db_product.quantity))
             self.db.commit()
             self.db.refresh(db_product)
+            product_index.upsert(db_product, version)
             return db_product
         except SQLAlchemyError as e:
             self.db.rollback()
             raise Exception(f"Error creating product: {str(e)}")
     
     def update(self, product_id: UUID, product_data: ProductUpdate) -> Optional[Product]:
-        """Update an existing product in the database"""
+        """
+        Update an existing product in the database
+        
+        Issues a single UPDATE ... WHERE id = :id RETURNING statement instead of
+        select / modify / refresh. Databases without UPDATE RETURNING fall back to
+        UPDATE + SELECT. Not-found is detected from the affected rows. When price
+        or quantity change, the old values are read (and locked) first for the
+        inventory aggregates.
+        """
         try:
-            db_product = self.get_by_id(product_id)
-            if not db_product:
-                return None
-            
             # Update only provided fields
             update_data = product_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_product, field, value)
+            if not update_data:
+                return self.get_by_id(product_id)
             
+            old = None
+            if "price" in update_data or "quantity" in update_data:
+                old = self.db.execute(
+                    select(self.model.price, self.model.quantity).where(self.model.id == product_id).with_for_update()
+                ).first()
+                if old is None:
+                    self.db.rollback()
+                    return None
+            
+            statement = update(self.model).where(self.model.id == product_id).values(**update_data)
+            if self.db.get_bind().dialect.update_returning:
+                db_product = self.db.scalars(statement.returning(self.model)).first()
+            else:
+                result = self.db.execute(statement, execution_options={"synchronize_session": False})
+                db_product = self.get_by_id(product_id) if result.rowcount else None
+            
+            if db_product is None:
+                self.db.rollback()
+                return None
+            
+            # Detach so the commit does not expire the returned values (which would cost another SELECT)
+            self.db.expunge(db_product)
+            version = self.touch_catalog()
+            self.log_changes([db_product.id])
+            if old is not None:
+                self.adjust_inventory_stats(net_deltas([(tuple(old), (db_product.price, db_product.quantity))]))
             self.db.commit()
-            self.db.refresh(db_product)
+            product_index.upsert(db_product, version)
             return db_product
         except SQLAlchemyError as e:
             self.db.rollback()
             raise Exception(f"Error updating product: {str(e)}")
     
     def delete(self, product_id: UUID) -> bool:
-        """Delete a product from the database"""
+        """
+        Delete a product from the database
+        
+        A single DELETE ... RETURNING price, quantity tells whether the product
+        existed and what to take off the inventory aggregates. Where RETURNING is
+        unavailable those are selected (and locked) before the DELETE.
+        """
         try:
-            db_product = self.get_by_id(product_id)
-            if not db_product:
-                return False
+            statement = delete(self.model).where(self.model.id == product_id)
+            if self.db.get_bind().dialect.delete_returning:
+                old = self.db.execute(statement.returning(self.model.price, self.model.quantity)).first()
+            else:
+                old = self.db.execute(
+                    select(self.model.price, self.model.quantity).where(self.model.id == product_id).with_for_update()
+                ).first()
+                if old is not None:
+                    self.db.execute(statement, execution_options={"synchronize_session": False})
             
-            self.db.delete(db_product)
+            deleted = old is not None
+            if deleted:
+                version = self.touch_catalog()
+                self.log_changes([product_id], "delete")
+                self.adjust_inventory_stats(contribution(*old, sign=-1))
             self.db.commit()
-            return True
+            if deleted:
+                product_index.remove(product_id, version)
+            return deleted
         except SQLAlchemyError as e:
             self.db.rollback()
             raise Exception(f"Error deleting product: {str(e)}")
     
-    def get_with_filters(self, filters: ProductFilters) -> List[Product]:
-        """Retrieve products with AI-generated filters"""
+    def bulk_create(self, products_data: List[ProductCreate], chunk_size: Optional[int] = None) -> Tuple[List[Product], List[BulkItemError]]:
+        """
+        Create many products with one multi-row INSERT ... RETURNING per chunk
+        
+        Each chunk is its own transaction. If a chunk fails, it is retried row by
+        row so that only the offending items are reported as errors. The returned
+        products are detached before the commit, so reading them costs no further
+        SELECTs. Databases without INSERT RETURNING get ids generated here and a
+        plain executemany INSERT.
+        """
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        created, errors = [], []
+        
+        for offset, chunk in chunked(products_data, chunk_size):
+            rows = [product_data.model_dump() for product_data in chunk]
+            try:
+                products = self._insert_rows(rows)
+                version = self.touch_catalog()
+                self.log_changes(product.id for product in products)
+                self.adjust_inventory_stats(net_deltas([(None, (row["price"], row["quantity"])) for row in rows]))
+                self.db.commit()
+                for product in products:
+                    product_index.upsert(product, version)
+            except SQLAlchemyError:
+                self.db.rollback()
+                products = []
+                for position, row in enumerate(rows):
+                    try:
+                        inserted = self._insert_rows([row])
+                        version = self.touch_catalog()
+                        self.log_changes(product.id for product in inserted)
+                        self.adjust_inventory_stats(contribution(row["price"], row["quantity"]))
+                        self.db.commit()
+                    except SQLAlchemyError as e:
+                        self.db.rollback()
+                        errors.append(BulkItemError(index=offset + position, error=f"Error creating product: {str(e)}"))
+                        continue
+                    for product in inserted:
+                        product_index.upsert(product, version)
+                    products.extend(inserted)
+            
+            created.extend(products)
+        
+        return created, errors
+    
+    def _insert_rows(self, rows: List[dict]) -> List[Product]:
+        """INSERT the rows and return them as products detached from the session"""
+        if self.db.get_bind().dialect.insert_executemany_returning:
+            products = self.db.scalars(insert(self.model).returning(self.model), rows).all()
+            for product in products:
+                # Detach so the commit does not expire the returned values (which would cost a SELECT per row)
+                self.db.expunge(product)
+            return products
+        rows = [{**row, "id": uuid4()} for row in rows]
+        self.db.execute(insert(self.model.__table__), rows)
+        return [self.model(**row) for row in rows]
+    
+    def bulk_update(self, products_data: List[ProductBulkUpdate], chunk_size: Optional[int] = None) -> Tuple[List[Product], List[BulkItemError]]:
+        """
+        Update many products by UUID with executemany UPDATEs, one transaction per chunk
+        
+        Each chunk costs an existence check (which also reads and locks the old
+        price / quantity for the inventory aggregates), one batched UPDATE and one
+        SELECT of the updated rows, detached before the commit so reading them
+        costs nothing more. Unknown UUIDs are reported per item.
+        """
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        updated, errors = [], []
+        
+        for offset, chunk in chunked(products_data, chunk_size):
+            try:
+                chunk_ids = [item.id for item in chunk]
+                existing = {
+                    row.id: (row.price, row.quantity)
+                    for row in self.db.execute(
+                        select(self.model.id, self.model.price, self.model.quantity)
+                        .where(self.model.id.in_(chunk_ids))
+                        # Lock in id order, like adjust_stock, so concurrent batches cannot deadlock
+                        .order_by(self.model.id)
+                        .with_for_update()
+                    )
+                }
+                
+                rows, stock_changes = [], []
+                for position, item in enumerate(chunk):
+                    if item.id not in existing:
+                        errors.append(BulkItemError(index=offset + position, id=item.id, error="Product not found"))
+                        continue
+                    row = item.model_dump(exclude_unset=True)
+                    row["id"] = item.id
+                    if len(row) > 1:
+                        rows.append(row)
+                    if "price" in row or "quantity" in row:
+                        # Chained through `existing` so an id repeated in the chunk stays exact
+                        old = existing[item.id]
+                        existing[item.id] = (row.get("price", old[0]), row.get("quantity", old[1]))
+                        stock_changes.append((old, existing[item.id]))
+                
+                version = None
+                if rows:
+                    # ORM bulk UPDATE by primary key - sent as executemany
+                    self.db.execute(update(self.model), rows)
+                    version = self.touch_catalog()
+                    self.log_changes(dict.fromkeys(row["id"] for row in rows))
+                    self.adjust_inventory_stats(net_deltas(stock_changes))
+                
+                # Read under the row locks, then detach so the commit does not expire them
+                products = self.db.scalars(
+                    select(self.model).where(self.model.id.in_(list(existing))).execution_options(populate_existing=True)
+                ).all()
+                for product in products:
+                    self.db.expunge(product)
+                self.db.commit()
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                errors.extend(
+                    BulkItemError(index=offset + position, id=item.id, error=f"Error updating product: {str(e)}")
+                    for position, item in enumerate(chunk)
+                )
+                continue
+            
+            if version is not None:
+                for product in products:
+                    product_index.upsert(product, version)
+            updated.extend(products)
+        
+        return updated, errors
+    
+    def bulk_delete(self, product_ids: List[UUID], chunk_size: Optional[int] = None) -> Tuple[List[UUID], List[BulkItemError]]:
+        """
+        Delete many products with one SELECT ... FOR UPDATE and one DELETE ... WHERE id IN (...) per chunk
+        
+        The SELECT locks the rows in id order, like adjust_stock and
+        bulk_update, so concurrent batches cannot deadlock - a DELETE ...
+        RETURNING would lock them in whatever order the plan visits them. It
+        also reads the price / quantity for the inventory aggregates.
+        """
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        deleted, errors = [], []
+        
+        for offset, chunk in chunked(product_ids, chunk_size):
+            try:
+                returned = self.db.execute(
+                    select(self.model.id, self.model.price, self.model.quantity)
+                    .where(self.model.id.in_(chunk))
+                    .order_by(self.model.id)
+                    .with_for_update()
+                ).all()
+                if returned:
+                    self.db.execute(
+                        delete(self.model).where(self.model.id.in_(chunk)),
+                        execution_options={"synchronize_session": False}
+                    )
+                removed = {row.id for row in returned}
+                if removed:
+                    version = self.touch_catalog()
+                    self.log_changes(removed, "delete")
+                    self.adjust_inventory_stats(net_deltas([((row.price, row.quantity), None) for row in returned]))
+                self.db.commit()
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                errors.extend(
+                    BulkItemError(index=offset + position, id=product_id, error=f"Error deleting product: {str(e)}")
+                    for position, product_id in enumerate(chunk)
+                )
+                continue
+            
+            for position, product_id in enumerate(chunk):
+                if product_id in removed:
+                    removed.discard(product_id)
+                    product_index.remove(product_id, version)
+                    deleted.append(product_id)
+                else:
+                    errors.append(BulkItemError(index=offset + position, id=product_id, error="Product not found"))
+        
+        return deleted, errors
+    
+    def adjust_stock(
+        self,
+        adjustments: List[ProductStockAdjustment],
+        atomic: bool = True
+    ) -> Tuple[List[Product], List[StockAdjustmentError]]:
+        """
+        Apply quantity deltas with one conditional UPDATE per product, in one transaction
+        
+        A decrement is UPDATE ... SET quantity = quantity - :n WHERE id = :id AND
+        quantity >= :n RETURNING ..., so the stock check and the write are a single
+        statement: concurrent orders cannot oversell or lose updates, and no
+        read-modify-write round trip happens under the lock. Items are applied in
+        id order so concurrent batches lock rows in the same order. With atomic,
+        one failed item rolls the whole batch back; otherwise the items that fit
+        are applied. Only a failed item costs an extra SELECT, to tell a missing
+        product from insufficient stock.
+        
+        The row locks are held until the commit, and before it a batch that
+        changed anything runs the bookkeeping of every write: touch_catalog
+        (the single catalog_version row), log_changes and adjust_inventory_stats
+        (the inventory total rows). Stock adjustments therefore serialize with
+        each other and with every other catalog write - that lock is what keeps
+        change log seqs in commit order and the ETags and aggregates exact. A
+        batch that changes nothing rolls back without touching them. See
+        benchmarks/stock_contention.py --products for the cost.
+        """
+        returning = self.db.get_bind().dialect.update_returning
+        adjusted, errors, stock_changes = [], [], []
         try:
+            for index, item in sorted(enumerate(adjustments), key=lambda pair: pair[1].id):
+                statement = (
+                    update(self.model)
+                    .where(self.model.id == item.id)
+                    .values(quantity=func.coalesce(self.model.quantity, 0) + item.delta)
+                    .execution_options(synchronize_session=False)
+                )
+                if item.delta < 0:
+                    statement = statement.where(self.model.quantity >= -item.delta)
+                
+                if returning:
+                    product = self.db.scalars(
+                        statement.returning(self.model), execution_options={"populate_existing": True}
+                    ).first()
+                elif self.db.execute(statement).rowcount:
+                    product = self.db.query(self.model).filter(self.model.id == item.id).populate_existing().first()
+                else:
+                    product = None
+                
+                if product is None:
+                    available = self.db.scalar(
+                        select(func.coalesce(self.model.quantity, 0)).where(self.model.id == item.id)
+                    )
+                    errors.append(StockAdjustmentError(
+                        index=index,
+                        id=item.id,
+                        error="Product not found" if available is None else f"Insufficient stock: {available} available",
+                        available=available
+                    ))
+                    continue
+                stock_changes.append(((product.price, product.quantity - item.delta), (product.price, product.quantity)))
+                adjusted.append((index, product))
+            
+            if not adjusted or (atomic and errors):
+                self.db.rollback()
+                return [], sorted(errors, key=lambda error: error.index)
+            
+            products = list({product.id: product for _, product in sorted(adjusted, key=lambda pair: pair[0])}.values())
+            for product in products:
+                # Detach so the commit does not expire the returned values
+                self.db.expunge(product)
+            version = self.touch_catalog()
+            self.log_changes(product.id for product in products)
+            self.adjust_inventory_stats(net_deltas(stock_changes))
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error adjusting stock: {str(e)}")
+        
+        for product in products:
+            product_index.upsert(product, version)
+        return products, sorted(errors, key=lambda error: error.index)
+    
+    def _copy_rows(self, rows: List[dict]) -> bool:
+        """
+        Send rows to PostgreSQL with COPY ... FROM STDIN inside the session's transaction
+        
+        Returns False when the DBAPI driver has no COPY support, so the caller
+        can fall back to a batched INSERT.
+        """
+        cursor = self.db.connection().connection.dbapi_connection.cursor()
+        buffer = io.StringIO()
+        # Quote strings so an empty description is loaded as '' rather than NULL
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(
+            (str(row["id"]), row["name"], row["price"], row["description"], row["quantity"]) for row in rows
+        )
+        statement = f"COPY {self.model.__tablename__} (id, name, price, description, quantity) FROM STDIN WITH (FORMAT csv)"
+        try:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+            elif hasattr(cursor, "copy"):  # psycopg 3
+                with cursor.copy(statement) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                return False
+        except Exception as e:
+            # Driver errors bypass SQLAlchemy - re-raise so load_rows rolls back
+            raise SQLAlchemyError(str(e)) from e
+        finally:
+            cursor.close()
+        return True
+    
+    def load_rows(self, rows: List[dict], upsert_by_name: bool = False) -> Tuple[List[UUID], List[UUID]]:
+        """
+        Load validated ProductCreate rows in one transaction - the bulk import path
+        
+        New rows go in with COPY on PostgreSQL and one executemany INSERT
+        elsewhere. With upsert_by_name, a row whose name already exists updates
+        every product of that name instead, and only the last row of a name
+        repeated within the batch is kept. On the fts5 search backend the
+        per-row insert trigger is suspended and the new rows are indexed with
+        one INSERT ... SELECT instead. Returns (created ids, updated ids).
+        """
+        try:
+            updates, stock_changes = [], []
+            if upsert_by_name:
+                by_name = {row["name"]: row for row in rows}
+                matched = set()
+                for product_id, name, price, quantity in self.db.execute(
+                    select(self.model.id, self.model.name, self.model.price, self.model.quantity)
+                    .where(self.model.name.in_(list(by_name)))
+                    .with_for_update()
+                ):
+                    updates.append({**by_name[name], "id": product_id})
+                    stock_changes.append(((price, quantity), (by_name[name]["price"], by_name[name]["quantity"])))
+                    matched.add(name)
+                rows = [row for name, row in by_name.items() if name not in matched]
+            inserts = [{**row, "id": uuid4()} for row in rows]
+            updated_ids = [row["id"] for row in updates]
+            
+            # Opens the write transaction before any trigger DDL below
+            version = self.touch_catalog()
+            self.log_changes(updated_ids + [row["id"] for row in inserts])
+            stock_changes.extend((None, (row["price"], row["quantity"])) for row in inserts)
+            self.adjust_inventory_stats(net_deltas(stock_changes))
+            fts5 = bool(inserts) and get_search_backend(self.db.get_bind().dialect.name) == "fts5"
+            if fts5:
+                suspend_fts5_insert_trigger(self.db)
+                max_key = self.db.scalar(select(func.max(PRODUCT_SEARCH_KEYS.c.key))) or 0
+            
+            if inserts:
+                copied = self.db.get_bind().dialect.name == "postgresql" and self._copy_rows(inserts)
+                if not copied:
+                    self.db.execute(insert(self.model.__table__), inserts)
+            if updates:
+                # ORM bulk UPDATE by primary key - sent as executemany
+                self.db.execute(update(self.model), updates)
+            
+            if fts5:
+                self.db.execute(insert(PRODUCT_SEARCH_KEYS), [{"product_id": row["id"]} for row in inserts])
+                index_fts5_keys_after(self.db, max_key)
+                restore_fts5_insert_trigger(self.db)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error importing products: {str(e)}")
+        
+        created_ids = [row["id"] for row in inserts]
+        if product_index.enabled:
+            for product in self.db.scalars(select(self.model).where(self.model.id.in_(created_ids + updated_ids))):
+                product_index.upsert(product, version)
+        return created_ids, updated_ids
+    
+    def _text_terms(self, filters: ProductFilters) -> List[Tuple[Any, str]]:
+        """Distinct, non-empty (column, term) pairs from the name/description filters"""
+        terms = []
+        if filters.name and filters.name.contains:
+            terms.extend((self.model.name, term.strip()) for term in filters.name.contains)
+        if filters.description and filters.description.contains:
+            terms.extend((self.model.description, term.strip()) for term in filters.description.contains)
+        # The LLM prompt asks for many spelling variants, drop the repeats
+        return list(dict.fromkeys((column, term) for column, term in terms if term))
+    
+    def _numeric_conditions(self, filters: ProductFilters) -> list:
+        """Quantity / price range conditions - lt and gt of one field are combined with AND"""
+        conditions = []
+        for column, numeric_filter in ((self.model.quantity, filters.quantity), (self.model.price, filters.price)):
+            if not numeric_filter:
+                continue
+            range_conditions = []
+            if numeric_filter.lt is not None and numeric_filter.lt > 0:
+                range_conditions.append(column <= numeric_filter.lt)
+            if numeric_filter.gt is not None and numeric_filter.gt > 0:
+                range_conditions.append(column >= numeric_filter.gt)
+            if range_conditions:
+                conditions.append(and_(*range_conditions))
+        return conditions
+    
+    def get_with_filters(self, filters: ProductFilters, limit: Optional[int] = None) -> List[Product]:
+        """
+        Retrieve products with AI-generated filters
+        
+        Every name/description term and every numeric range is OR-ed together.
+        Text terms are matched through the configured search backend (see
+        app.core.search): trigram GIN indexes on Postgres, an FTS5 table on
+        SQLite, or plain ILIKE. Indexed backends order matches by relevance,
+        ties and the like backend by (name, id).
+        """
+        try:
+            if limit is None:
+                limit = settings.search_result_limit
+            backend = get_search_backend(self.db.get_bind().dialect.name)
+            terms = self._text_terms(filters)
+            all_conditions = self._numeric_conditions(filters)
             q = self.db.query(self.model)
-            all_conditions = []
-
-            # Name search - handle array of search terms with OR logic
-            if filters.name and filters.name.contains:
-                name_conditions = []
-                for term in filters.name.contains:
-                    value = f"%{term}%"
-                    name_conditions.append(self.model.name.ilike(value))
-                if name_conditions:
-                    all_conditions.extend(name_conditions)
-
-            # Description search - handle array of search terms with OR logic
-            if filters.description and filters.description.contains:
-                desc_conditions = []
-                for term in filters.description.contains:
-                    value = f"%{term}%"
-                    desc_conditions.append(self.model.description.ilike(value))
-                if desc_conditions:
-                    all_conditions.extend(desc_conditions)
-
-            # Quantity filters - combine lt and gt with AND logic
-            if filters.quantity:
-                quantity_conditions = []
-                if filters.quantity.lt is not None and filters.quantity.lt > 0:
-                    quantity_conditions.append(self.model.quantity <= filters.quantity.lt)
-                if filters.quantity.gt is not None and filters.quantity.gt > 0:
-                    quantity_conditions.append(self.model.quantity >= filters.quantity.gt)
-                if quantity_conditions:
-                    # Combine quantity conditions with AND logic
-                    quantity_filter = quantity_conditions[0]
-                    for condition in quantity_conditions[1:]:
-                        quantity_filter = quantity_filter & condition
-                    all_conditions.append(quantity_filter)
-
-            # Price filters - combine lt and gt with AND logic
-            if filters.price:
-                price_conditions = []
-                if filters.price.lt is not None and filters.price.lt > 0:
-                    price_conditions.append(self.model.price <= filters.price.lt)
-                if filters.price.gt is not None and filters.price.gt > 0:
-                    price_conditions.append(self.model.price >= filters.price.gt)
-                if price_conditions:
-                    # Combine price conditions with AND logic
-                    price_filter = price_conditions[0]
-                    for condition in price_conditions[1:]:
-                        price_filter = price_filter & condition
-                    all_conditions.append(price_filter)
-
+            
+            if backend == "fts5" and terms:
+                indexed = [(column.key, term) for column, term in terms if len(term) >= MIN_TRIGRAM_TERM]
+                short = [column.ilike(f"%{term}%") for column, term in terms if len(term) < MIN_TRIGRAM_TERM]
+                all_conditions.extend(short)
+                if indexed:
+                    fts = text(
+                        "SELECT k.product_id AS product_id, bm25(products_fts) AS rank "
+                        "FROM products_fts JOIN product_search_keys k ON k.key = products_fts.rowid "
+                        "WHERE products_fts MATCH :match"
+                    ).bindparams(match=fts5_match_expression(indexed)).columns(
+                        column("product_id", Uuid(as_uuid=True)), column("rank", Float)
+                    ).subquery("fts")
+                    q = q.outerjoin(fts, fts.c.product_id == self.model.id)
+                    all_conditions.append(fts.c.product_id.isnot(None))
+                    # bm25 is lower-is-better; rows matched only by other conditions come last
+                    q = q.order_by(fts.c.rank.is_(None), fts.c.rank)
+            elif backend == "pg_trgm" and terms:
+                # Trigram GIN indexes serve these ILIKE predicates, including leading wildcards
+                all_conditions.extend(column.ilike(f"%{term}%") for column, term in terms)
+                relevance = func.greatest(*[func.word_similarity(term, column) for column, term in terms])
+                q = q.order_by(relevance.desc())
+            else:
+                all_conditions.extend(column.ilike(f"%{term}%") for column, term in terms)
+            
             # Apply all conditions with OR logic
             if all_conditions:
                 q = q.filter(or_(*all_conditions))
-
+            
             # print("\n\n", q.statement, "\n\n", filters, "\n\n")
-
-            return q.all()
+            
+            # Ties (and every row on the like backend) in (name, id) order, as the product index returns them
+            return q.order_by(self.model.name, self.model.id).limit(limit).all()
         except SQLAlchemyError as e:
             raise Exception(f"Error retrieving filtered products: {str(e)}")
     
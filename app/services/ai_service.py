@@ -1,11 +1,151 @@
+import asyncio
+from typing import Dict, List, Tuple
+from app.config.settings import settings
+from app.core.product_index import product_index
+from app.models.schemas import ProductFilters, ProductResponse, ProductSearchBatchResponse, ProductSearchResult
+from app.repositories.product_repository import ProductRepository
 from app.utils.ai_utils import AIUtils
+from app.utils.filter_cache import FilterCache, normalize_query
+from app.utils.query_parser import QueryParser
+from app.utils.single_flight import SingleFlight
 
 ai_utils = AIUtils()
 
+query_parser = QueryParser(min_confidence=settings.ai_fast_path_min_confidence)
+
+# Identical queries in flight at the same time share one upstream LLM call
+filter_flights = SingleFlight()
+
+filter_cache = FilterCache(
+    max_entries=settings.ai_filter_cache_size,
+    ttl_seconds=settings.ai_filter_cache_ttl_seconds,
+    path=settings.ai_filter_cache_path or None,
+    disk_max_entries=settings.ai_filter_cache_disk_size
+)
+
 def get_ai_product_filters(user_query: str):
     """Get AI-generated product filters from natural language query."""
     try:
-        return ai_utils.llm_to_filter(user_query)
+        if settings.ai_fast_path_enabled:
+            parsed = query_parser.try_parse(user_query)
+            if parsed is not None:
+                return parsed
+        
+        if settings.ai_filter_cache_enabled:
+            cached = filter_cache.get(user_query)
+            if cached is not None:
+                return cached
+        
+        filters = ai_utils.llm_to_filter(user_query)
+        
+        if settings.ai_filter_cache_enabled:
+            filter_cache.set(user_query, filters)
+        return filters
+    except Exception as e:
+        # Re-raise with more context about the service layer
+        raise Exception(f"Failed to generate AI product filters for query '{user_query}': {str(e)}")
+
+
+async def get_ai_product_filters_async(user_query: str):
+    """Non-blocking variant of get_ai_product_filters with single-flight coalescing."""
+    try:
+        if settings.ai_fast_path_enabled:
+            parsed = query_parser.try_parse(user_query)
+            if parsed is not None:
+                return parsed
+        
+        if settings.ai_filter_cache_enabled:
+            cached = filter_cache.get(user_query)
+            if cached is not None:
+                return cached
+        
+        async def translate():
+            filters = await ai_utils.async_llm_to_filter(user_query)
+            if settings.ai_filter_cache_enabled:
+                filter_cache.set(user_query, filters)
+            return filters
+        
+        return await filter_flights.do(normalize_query(user_query), translate)
     except Exception as e:
         # Re-raise with more context about the service layer
         raise Exception(f"Failed to generate AI product filters for query '{user_query}': {str(e)}")
+
+
+def search_with_filters(repository: ProductRepository, filters: ProductFilters) -> List[ProductResponse]:
+    """Products matching AI filters - from the in-process index when it is ready, otherwise the database"""
+    if product_index.enabled and product_index.ready:
+        return product_index.search(filters, limit=settings.search_result_limit)
+    return [ProductResponse.model_validate(product) for product in repository.get_with_filters(filters)]
+
+
+async def search_products_batch(user_queries: List[str], repository: ProductRepository) -> ProductSearchBatchResponse:
+    """
+    Answer many natural language searches in one call
+    
+    Queries are deduplicated by normalize_query and the unique ones translated
+    concurrently, at most settings.ai_batch_concurrency at a time (each LLM call
+    also waits for an AIUtils slot, so a batch cannot crowd out interactive
+    searches). A single consumer runs each set of filters as soon as it arrives,
+    so the one session serves one statement at a time while the remaining
+    translations are still in flight, and queries whose filters come out the
+    same share one search. A failed query is reported with its error and does
+    not affect the others.
+    """
+    unique: Dict[str, str] = {}
+    for user_query in user_queries:
+        unique.setdefault(normalize_query(user_query), user_query)
+    
+    outcomes: Dict[str, Tuple[List[ProductResponse], str]] = {}
+    translated: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(settings.ai_batch_concurrency)
+    
+    async def translate(key: str, user_query: str):
+        async with slots:
+            try:
+                filters = await get_ai_product_filters_async(user_query)
+            except Exception as e:
+                outcomes[key] = ([], str(e))
+                return
+        await translated.put((key, filters))
+    
+    def run_search(filters: ProductFilters) -> List[ProductResponse]:
+        try:
+            return search_with_filters(repository, filters)
+        except Exception:
+            # A failed statement aborts the transaction on PostgreSQL - reset it for the next
+            # query, in the worker thread that used the session
+            repository.db.rollback()
+            raise
+    
+    async def search():
+        searched: Dict[str, Tuple[List[ProductResponse], str]] = {}
+        while True:
+            item = await translated.get()
+            if item is None:
+                return
+            key, filters = item
+            signature = filters.model_dump_json()
+            if signature not in searched:
+                try:
+                    searched[signature] = (await asyncio.to_thread(run_search, filters), None)
+                except Exception as e:
+                    searched[signature] = ([], f"Error searching products: {str(e)}")
+            outcomes[key] = searched[signature]
+    
+    searcher = asyncio.create_task(search())
+    try:
+        await asyncio.gather(*(translate(key, user_query) for key, user_query in unique.items()))
+        await translated.put(None)
+        await searcher
+    finally:
+        searcher.cancel()
+    
+    results = []
+    for user_query in user_queries:
+        products, error = outcomes[normalize_query(user_query)]
+        results.append(ProductSearchResult(user_query=user_query, products=products, count=len(products), error=error))
+    return ProductSearchBatchResponse(
+        results=results,
+        unique_queries=len(unique),
+        failed=sum(1 for result in results if result.error is not None)
+    )
@@ -0,0 +1,83 @@
+import argparse
+import json
+import math
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.core.analytics import histogram_counts
+from app.repositories.product_repository import ProductRepository
+from app.models.schemas import AggregateMismatch, InventoryStatsResponse, InventoryStatsVerifyResponse
+
+
+class AnalyticsService:
+    """Service layer for the inventory dashboard"""
+    
+    def __init__(self, db: Session):
+        self.repository = ProductRepository(db)
+    
+    def get_inventory_stats(self) -> InventoryStatsResponse:
+        """
+        Dashboard totals and histograms from the stored aggregates
+        
+        Reads the fixed-size inventory_aggregates table, never products, so the
+        cost does not grow with the catalog.
+        """
+        values = self.repository.get_inventory_stats()
+        return InventoryStatsResponse(
+            total_skus=int(values.get("skus", 0)),
+            total_units=int(values.get("units", 0)),
+            inventory_value=round(values.get("value", 0.0), 2),
+            low_stock_count=int(values.get("low_stock", 0)),
+            low_stock_threshold=settings.low_stock_threshold,
+            price_histogram=histogram_counts(values, "price"),
+            quantity_histogram=histogram_counts(values, "quantity")
+        )
+    
+    def verify_inventory_stats(self, repair: bool = False) -> InventoryStatsVerifyResponse:
+        """
+        Compare the stored aggregates with a full scan of products
+        
+        inventory value is a float sum of many deltas, so it is compared with a
+        relative tolerance. With repair, mismatched aggregates are rebuilt from
+        a fresh scan.
+        """
+        stored = self.repository.get_inventory_stats()
+        actual = self.repository.compute_inventory_stats()
+        mismatches = [
+            AggregateMismatch(key=key, stored=stored.get(key), actual=value)
+            for key, value in actual.items()
+            if key not in stored or not math.isclose(stored[key], value, rel_tol=1e-9, abs_tol=1e-6)
+        ]
+        mismatches.extend(
+            AggregateMismatch(key=key, stored=value, actual=0) for key, value in stored.items() if key not in actual
+        )
+        repaired = bool(mismatches) and repair
+        if repaired:
+            self.repository.recompute_inventory_stats()
+        return InventoryStatsVerifyResponse(consistent=not mismatches, mismatches=mismatches, repaired=repaired)
+
+
+def main():
+    """python -m app.services.analytics_service verify|recompute"""
+    parser = argparse.ArgumentParser(description="Verify or rebuild the inventory analytics aggregates")
+    parser.add_argument("command", choices=("verify", "recompute"))
+    parser.add_argument("--repair", action="store_true", help="with verify, rebuild the aggregates if they drifted")
+    args = parser.parse_args()
+    
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        service = AnalyticsService(db)
+        if args.command == "recompute":
+            service.repository.recompute_inventory_stats()
+            print(service.get_inventory_stats().model_dump_json(indent=2))
+            return
+        report = service.verify_inventory_stats(repair=args.repair)
+        print(json.dumps(report.model_dump(), indent=2))
+        if not report.consistent and not report.repaired:
+            raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
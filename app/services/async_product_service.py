@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.async_product_repository import AsyncProductRepository
+from app.services.product_service import BaseProductService
+from app.models.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductBulkUpdate,
+    ProductResponse,
+    ProductListResponse,
+    BulkOperationResponse,
+    ProductStockAdjustment,
+    StockAdjustmentResponse,
+    ProductChangesResponse
+)
+from app.utils.pagination import decode_cursor
+from uuid import UUID
+
+
+class AsyncProductService(BaseProductService):
+    """Async service layer for product business logic - awaits the repository, shares the rest with ProductService"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(AsyncProductRepository(db), db.info.get("read_replica", False))
+
+    async def get_catalog_version(self) -> Optional[Tuple[int, datetime]]:
+        """Catalog-wide (version, updated_at) used for ETag / Last-Modified"""
+        return await self.repository.get_catalog_version()
+
+    async def get_all_products(self) -> ProductListResponse:
+        """Get all products with count"""
+        return self._list_response(await self.repository.get_all())
+
+    async def get_products_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "name",
+        order: str = "asc"
+    ) -> ProductListResponse:
+        """Get one page of products plus the cursor for the next page"""
+        after = decode_cursor(cursor, sort_by, order) if cursor else None
+        return self._page_response(await self.repository.get_page(limit, sort_by, order, after), limit, sort_by, order)
+
+    async def get_all_products_payload(self) -> dict:
+        """Fast path of get_all_products for large lists - plain dicts built from column rows"""
+        return self._page_payload(await self.repository.get_all_rows())
+
+    async def get_products_page_payload(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "name",
+        order: str = "asc"
+    ) -> dict:
+        """Fast path of get_products_page - plain dicts built from column rows"""
+        after = decode_cursor(cursor, sort_by, order) if cursor else None
+        rows = await self.repository.get_page(limit, sort_by, order, after, as_rows=True)
+        return self._page_payload(rows, limit, sort_by, order)
+
+    async def get_product_by_id(self, product_id: UUID) -> Optional[ProductResponse]:
+        """Get a specific product by UUID - served from product_cache when possible"""
+        key = str(product_id)
+        cached, lease = self._cached_product(key)
+        if cached is not None:
+            return cached
+        return self._read_product(key, lease, await self.repository.get_by_id(product_id))
+
+    async def create_product(self, product_data: ProductCreate) -> ProductResponse:
+        """Create a new product"""
+        product = await self.repository.create(product_data)
+        self._written()
+        return ProductResponse.model_validate(product)
+
+    async def update_product(self, product_id: UUID, product_data: ProductUpdate) -> Optional[ProductResponse]:
+        """Update an existing product"""
+        product = await self.repository.update(product_id, product_data)
+        self._written([product_id])
+        if product:
+            return ProductResponse.model_validate(product)
+        return None
+
+    async def delete_product(self, product_id: UUID) -> bool:
+        """Delete a product"""
+        deleted = await self.repository.delete(product_id)
+        self._written([product_id])
+        return deleted
+
+    async def bulk_create_products(self, products_data: List[ProductCreate]) -> BulkOperationResponse:
+        """Create many products, reporting per-item errors"""
+        products, errors = await self.repository.bulk_create(products_data)
+        self._written()
+        return self._bulk_response(products, errors)
+
+    async def bulk_update_products(self, products_data: List[ProductBulkUpdate]) -> BulkOperationResponse:
+        """Update many products, reporting per-item errors"""
+        products, errors = await self.repository.bulk_update(products_data)
+        self._written(item.id for item in products_data)
+        return self._bulk_response(products, errors)
+
+    async def bulk_delete_products(self, product_ids: List[UUID]) -> BulkOperationResponse:
+        """Delete many products, reporting per-item errors"""
+        deleted_ids, errors = await self.repository.bulk_delete(product_ids)
+        self._written(deleted_ids)
+        return self._bulk_delete_response(deleted_ids, errors)
+
+    async def adjust_stock(self, adjustments: List[ProductStockAdjustment], atomic: bool = True) -> StockAdjustmentResponse:
+        """Apply stock deltas with conditional UPDATEs, reporting per-item errors"""
+        products, errors = await self.repository.adjust_stock(adjustments, atomic)
+        self._written(product.id for product in products)
+        return self._stock_response(products, errors)
+
+    async def get_changes(self, since: int, limit: int) -> Optional[ProductChangesResponse]:
+        """Product changes after seq `since` - None when the client has to resync from since=0"""
+        changes = await self.repository.get_changes(since, limit)
+        return self._changes_response(since, changes, await self.repository.get_change_horizon())
+
+    async def product_exists(self, product_id: UUID) -> bool:
+        """Check if a product exists"""
+        return await self.repository.get_by_id(product_id) is not None
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from typing import Iterator
+from app.core.database import SessionLocal
+from app.repositories.product_repository import ProductRepository
+
+EXPORT_FIELDS = ["id", "name", "price", "description", "quantity"]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _ndjson_batch(rows) -> str:
+    return "".join(
+        json.dumps({
+            "id": str(row.id),
+            "name": row.name,
+            "price": row.price,
+            "description": row.description,
+            "quantity": row.quantity
+        }) + "\n"
+        for row in rows
+    )
+
+
+def _csv_batch(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows((str(row.id), row.name, row.price, row.description, row.quantity) for row in rows)
+    return buffer.getvalue()
+
+
+def stream_product_export(export_format: str = "ndjson", batch_size: int = 1000) -> Iterator[str]:
+    """
+    Stream the whole catalog as NDJSON or CSV, one chunk per batch of rows
+    
+    The generator owns its session because it keeps reading after the request
+    handler has returned. It is a plain generator, so StreamingResponse iterates
+    it in the threadpool instead of on the event loop.
+    """
+    encode_batch = _csv_batch if export_format == "csv" else _ndjson_batch
+    
+    if export_format == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\r\n"
+    
+    db = SessionLocal()
+    try:
+        batch = []
+        for row in ProductRepository(db).iter_rows(batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield encode_batch(batch)
+                batch = []
+        if batch:
+            yield encode_batch(batch)
+    finally:
+        db.close()
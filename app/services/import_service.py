@@ -0,0 +1,292 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+from pydantic import ValidationError
+from app.config.settings import settings
+from app.core.change_stream import change_broadcaster
+from app.core.database import SessionLocal
+from app.models.schemas import ImportErrorReport, ImportJobResponse, ImportRowError, ProductCreate
+from app.repositories.import_repository import ImportJobRepository
+from app.repositories.product_repository import ProductRepository
+from app.services.product_service import product_cache
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+IMPORT_FIELDS = ["name", "price", "description", "quantity"]
+
+# Finished jobs kept for the status endpoint, oldest dropped first
+MAX_TRACKED_JOBS = 100
+
+# Columns of ProductImport a job updates as it runs
+PROGRESS_FIELDS = (
+    "status", "bytes_read", "rows_read", "created", "updated", "rejected", "error", "started_at", "finished_at"
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def import_job_response(job) -> ImportJobResponse:
+    """ImportJobResponse from an ImportJob or a ProductImport row"""
+    if job.started_at is None:
+        elapsed = 0.0
+    else:
+        elapsed = ((job.finished_at or _utcnow()) - job.started_at).total_seconds()
+    return ImportJobResponse(
+        id=job.id,
+        status=job.status,
+        format=job.format,
+        upsert_by_name=job.upsert_by_name,
+        bytes_total=job.bytes_total,
+        bytes_read=job.bytes_read,
+        progress=round(job.bytes_read / job.bytes_total, 4) if job.bytes_total else 1.0,
+        rows_read=job.rows_read,
+        created=job.created,
+        updated=job.updated,
+        rejected=job.rejected,
+        rows_per_sec=round(job.rows_read / elapsed, 1) if elapsed > 0 else 0.0,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error
+    )
+
+
+class ImportJob:
+    """
+    Progress counters and rejected rows of one background import
+
+    The worker running the job keeps them here and saves them to the
+    product_imports tables after every chunk (see ImportJobRepository), which
+    is where the status endpoints read them - so they answer on any worker.
+    A job whose worker stops mid-run keeps its last saved state.
+    """
+
+    def __init__(self, import_format: str, upsert_by_name: bool, path: str, bytes_total: int):
+        self.id = uuid4()
+        self.format = import_format
+        self.upsert_by_name = upsert_by_name
+        self.path = path
+        self.bytes_total = bytes_total
+        self.bytes_read = 0
+        self.status = "queued"
+        self.rows_read = 0
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        # Rejected rows not saved yet, and how many have been kept in total
+        self.errors: List[ImportRowError] = []
+        self.errors_kept = 0
+        self.error: Optional[str] = None
+        self.queued_at = _utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def reject(self, line: int, error: str, row: Optional[str] = None):
+        self.rejected += 1
+        if self.errors_kept < settings.import_max_errors:
+            self.errors_kept += 1
+            self.errors.append(ImportRowError(line=line, error=error, row=row))
+
+    def to_response(self) -> ImportJobResponse:
+        return import_job_response(self)
+
+    def record(self) -> dict:
+        """Columns of the job's ProductImport row"""
+        return {
+            "id": self.id,
+            "format": self.format,
+            "upsert_by_name": self.upsert_by_name,
+            "bytes_total": self.bytes_total,
+            "queued_at": self.queued_at,
+            **self.progress()
+        }
+
+    def progress(self) -> dict:
+        return {field: getattr(self, field) for field in PROGRESS_FIELDS}
+
+    def save(self, repository: ImportJobRepository):
+        """Write the counters and the rejected rows found since the last save"""
+        errors, self.errors = self.errors, []
+        repository.save(self.id, self.progress(), errors)
+
+
+def _register_import_job(job: ImportJob):
+    db = SessionLocal()
+    try:
+        repository = ImportJobRepository(db)
+        repository.create(job.record())
+        repository.prune(MAX_TRACKED_JOBS)
+    finally:
+        db.close()
+
+
+def get_import_job(job_id: UUID) -> Optional[ImportJobResponse]:
+    """Status of an import job, or None when it is unknown or has been pruned"""
+    db = SessionLocal()
+    try:
+        job = ImportJobRepository(db).get(job_id)
+        return import_job_response(job) if job else None
+    finally:
+        db.close()
+
+
+def get_import_errors(job_id: UUID) -> Optional[ImportErrorReport]:
+    """Rejected rows of an import job, or None when it is unknown or has been pruned"""
+    db = SessionLocal()
+    try:
+        repository = ImportJobRepository(db)
+        job = repository.get(job_id)
+        if job is None:
+            return None
+        errors = [
+            ImportRowError(line=error.line, error=error.error, row=error.row)
+            for error in repository.get_errors(job_id)
+        ]
+        return ImportErrorReport(
+            job_id=job.id,
+            rejected=job.rejected,
+            truncated=job.rejected > len(errors),
+            errors=errors
+        )
+    finally:
+        db.close()
+
+
+def detect_import_format(content_type: Optional[str]) -> Optional[str]:
+    """Import format implied by a request Content-Type, if any"""
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    return None
+
+
+async def create_import_job(chunks: AsyncIterator[bytes], import_format: str, upsert_by_name: bool = False) -> ImportJob:
+    """
+    Spool an upload to a temporary file and record its import job
+
+    The body is written to disk as it arrives, so large feeds are never held in
+    memory; run_import_job then reads the file after the response has been sent.
+    The temporary file is local, so the job runs on the worker that received it.
+    """
+    handle, path = tempfile.mkstemp(prefix="product-import-", suffix=f".{import_format}")
+    size = 0
+    try:
+        with os.fdopen(handle, "wb") as spool:
+            async for chunk in chunks:
+                spool.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    job = ImportJob(import_format, upsert_by_name, path, size)
+    try:
+        await asyncio.to_thread(_register_import_job, job)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return job
+
+
+def _read_csv(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[dict], str]]:
+    """(line number, raw row, source text) per CSV record"""
+    reader = csv.DictReader(text)
+    missing = [field for field in IMPORT_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    for row in reader:
+        # Extra columns (e.g. the id of an export) are ignored
+        yield reader.line_num, {field: row[field] for field in IMPORT_FIELDS}, ",".join(row[field] or "" for field in IMPORT_FIELDS)
+
+
+def _read_ndjson(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[dict], str]]:
+    """(line number, raw row, source text) per non-blank line - the row is None when it is not a JSON object"""
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None, line
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+
+
+def _load_chunk(repository: ProductRepository, job: ImportJob, rows: List[dict], lines: List[int]):
+    try:
+        created_ids, updated_ids = repository.load_rows(rows, upsert_by_name=job.upsert_by_name)
+    except Exception as e:
+        for line in lines:
+            job.reject(line, str(e))
+        return
+    change_broadcaster.notify()
+    for product_id in updated_ids:
+        product_cache.delete(str(product_id))
+    job.created += len(created_ids)
+    job.updated += len(updated_ids)
+
+
+def run_import_job(job: ImportJob):
+    """
+    Parse, validate and load an uploaded file in chunks of settings.import_chunk_size rows
+
+    Each row is validated against ProductCreate; rejected rows are recorded on
+    the job with their line number and the import carries on. Every chunk is
+    loaded in its own transaction through ProductRepository.load_rows, and the
+    job's progress is saved after it.
+    """
+    job.status = "running"
+    job.started_at = _utcnow()
+    db = SessionLocal()
+    jobs_db = SessionLocal()
+    jobs = ImportJobRepository(jobs_db)
+    try:
+        job.save(jobs)
+        repository = ProductRepository(db)
+        read_rows = _read_csv if job.format == "csv" else _read_ndjson
+        with open(job.path, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            rows, lines = [], []
+            for line_number, row, source in read_rows(text):
+                job.rows_read += 1
+                if row is None:
+                    job.reject(line_number, "Expected a JSON object", source)
+                    continue
+                try:
+                    rows.append(ProductCreate.model_validate(row).model_dump())
+                    lines.append(line_number)
+                except ValidationError as e:
+                    job.reject(line_number, _validation_message(e), source)
+                if len(rows) >= settings.import_chunk_size:
+                    _load_chunk(repository, job, rows, lines)
+                    rows, lines = [], []
+                    job.bytes_read = raw.tell()
+                    job.save(jobs)
+            if rows:
+                _load_chunk(repository, job, rows, lines)
+        job.bytes_read = job.bytes_total
+        job.status = "succeeded"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        db.close()
+        job.finished_at = _utcnow()
+        try:
+            job.save(jobs)
+        finally:
+            jobs_db.close()
+            os.unlink(job.path)
@@ -1,45 +1,320 @@
-from typing import List, Optional
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.repositories.product_repository import ProductRepository
-from app.models.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from app.models.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductBulkUpdate,
+    ProductResponse,
+    ProductListResponse,
+    BulkOperationResponse,
+    ProductStockAdjustment,
+    StockAdjustmentResponse,
+    ProductChangeEntry,
+    ProductChangesResponse,
+    ChangeLogCompactionResponse
+)
+from app.config.settings import settings
+from app.core.change_stream import change_broadcaster
+from app.utils.fast_json import product_rows_to_dicts
+from app.utils.pagination import decode_cursor, page_cursor
+from app.utils.product_cache import build_cache_backend
 from uuid import UUID
 
+# Read-through cache of serialized ProductResponse objects, shared by the sync and async services
+product_cache = build_cache_backend(
+    settings.product_cache_backend,
+    max_entries=settings.product_cache_size,
+    ttl_seconds=settings.product_cache_ttl_seconds
+)
 
-class ProductService:
+
+def changes_page(since: int, entries: List[Row], rows: Dict[UUID, Row], has_more: bool) -> ProductChangesResponse:
+    """
+    Change feed page from change log entries and the current rows of their products
+    
+    A product changed several times within the page is reported once, at its
+    latest entry. An upsert whose product is gone is left out, since the
+    product's tombstone follows later in the feed.
+    """
+    latest = {}
+    for entry in entries:
+        latest[entry.product_id] = entry
+    changes = []
+    for entry in sorted(latest.values(), key=lambda entry: entry.seq):
+        product = None
+        if entry.op == "upsert":
+            row = rows.get(entry.product_id)
+            if row is None:
+                continue
+            product = ProductResponse.model_validate(row)
+        changes.append(ProductChangeEntry(
+            seq=entry.seq,
+            op=entry.op,
+            id=entry.product_id,
+            changed_at=entry.changed_at,
+            product=product
+        ))
+    return ProductChangesResponse(
+        changes=changes,
+        next_since=entries[-1].seq if entries else since,
+        has_more=has_more
+    )
+
+
+class BaseProductService:
+    """
+    Product business logic shared by ProductService and AsyncProductService
+    
+    Everything here runs between repository calls and does no I/O of its own -
+    response building, the read-through cache and write notifications - so the
+    two services differ only in how they call their repository.
+    """
+    
+    def __init__(self, repository, read_replica: bool = False):
+        self.repository = repository
+        # A lagging replica must not refill entries a write just invalidated
+        self.fill_cache = not read_replica
+    
+    @staticmethod
+    def _list_response(products: list) -> ProductListResponse:
+        """ProductListResponse over all products"""
+        product_responses = [ProductResponse.model_validate(product) for product in products]
+        return ProductListResponse(products=product_responses, count=len(product_responses))
+    
+    @staticmethod
+    def _page_response(products: list, limit: int, sort_by: str, order: str) -> ProductListResponse:
+        """ProductListResponse for a page fetched with one extra row, plus the next cursor"""
+        product_responses = [ProductResponse.model_validate(product) for product in products[:limit]]
+        return ProductListResponse(
+            products=product_responses,
+            count=len(product_responses),
+            next_cursor=page_cursor(products, limit, sort_by, order)
+        )
+    
+    @staticmethod
+    def _page_payload(rows: List[Row], limit: Optional[int] = None, sort_by: str = "name", order: str = "asc") -> dict:
+        """
+        ProductListResponse-shaped dict built from column rows
+        
+        Trusted database rows are not re-validated; pair it with FastJSONResponse.
+        """
+        products = product_rows_to_dicts(rows if limit is None else rows[:limit])
+        return {
+            "products": products,
+            "count": len(products),
+            "next_cursor": None if limit is None else page_cursor(rows, limit, sort_by, order)
+        }
+    
+    def _cached_product(self, key: str) -> Tuple[Optional[ProductResponse], Optional[int]]:
+        """
+        Cached product for `key`, or None and a cache lease to fill it with
+        
+        The lease is taken before the read: a write invalidating the key
+        meanwhile makes the fill in _read_product a no-op.
+        """
+        cached = product_cache.get(key)
+        if cached is not None:
+            return ProductResponse.model_validate_json(cached), None
+        return None, product_cache.lease(key) if self.fill_cache else None
+    
+    def _read_product(self, key: str, lease: Optional[int], product) -> Optional[ProductResponse]:
+        """ProductResponse for a product read from the database, filling the cache"""
+        if not product:
+            return None
+        response = ProductResponse.model_validate(product)
+        if self.fill_cache:
+            product_cache.set(key, response.model_dump_json().encode(), lease)
+        return response
+    
+    @staticmethod
+    def _written(product_ids=()) -> None:
+        """Wake change stream clients and drop the cache entries of the written products"""
+        change_broadcaster.notify()
+        for product_id in product_ids:
+            product_cache.delete(str(product_id))
+    
+    @staticmethod
+    def _bulk_response(products: list, errors: list) -> BulkOperationResponse:
+        """BulkOperationResponse for created or updated products"""
+        return BulkOperationResponse(
+            products=[ProductResponse.model_validate(product) for product in products],
+            succeeded=len(products),
+            failed=len(errors),
+            errors=errors
+        )
+    
+    @staticmethod
+    def _bulk_delete_response(deleted_ids: List[UUID], errors: list) -> BulkOperationResponse:
+        """BulkOperationResponse for deleted product ids"""
+        return BulkOperationResponse(
+            deleted_ids=deleted_ids,
+            succeeded=len(deleted_ids),
+            failed=len(errors),
+            errors=errors
+        )
+    
+    @staticmethod
+    def _stock_response(products: list, errors: list) -> StockAdjustmentResponse:
+        """StockAdjustmentResponse for the adjusted products"""
+        return StockAdjustmentResponse(
+            products=[ProductResponse.model_validate(product) for product in products],
+            succeeded=len(products),
+            failed=len(errors),
+            errors=errors
+        )
+    
+    @staticmethod
+    def _changes_response(since: int, changes: Tuple[List[Row], Dict[UUID, Row], bool], horizon: int) -> Optional[ProductChangesResponse]:
+        """Change feed page, or None when compaction removed tombstones past `since`"""
+        if 0 < since < horizon:
+            return None
+        return changes_page(since, *changes)
+
+
+class ProductService(BaseProductService):
     """Service layer for product business logic"""
     
     def __init__(self, db: Session):
-        self.repository = ProductRepository(db)
+        super().__init__(ProductRepository(db), db.info.get("read_replica", False))
+    
+    def get_catalog_version(self) -> Optional[Tuple[int, datetime]]:
+        """Catalog-wide (version, updated_at) used for ETag / Last-Modified"""
+        return self.repository.get_catalog_version()
     
     def get_all_products(self) -> ProductListResponse:
         """Get all products with count"""
-        products = self.repository.get_all()
-        product_responses = [ProductResponse.model_validate(product) for product in products]
-        return ProductListResponse(products=product_responses, count=len(product_responses))
+        return self._list_response(self.repository.get_all())
+    
+    def get_products_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "name",
+        order: str = "asc"
+    ) -> ProductListResponse:
+        """Get one page of products plus the cursor for the next page"""
+        after = decode_cursor(cursor, sort_by, order) if cursor else None
+        return self._page_response(self.repository.get_page(limit, sort_by, order, after), limit, sort_by, order)
+    
+    def get_all_products_payload(self) -> dict:
+        """
+        Fast path of get_all_products for large lists
+        
+        Selects plain column rows and builds ProductListResponse-shaped dicts
+        without re-validating trusted database rows; pair it with FastJSONResponse.
+        """
+        return self._page_payload(self.repository.get_all_rows())
+    
+    def get_products_page_payload(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "name",
+        order: str = "asc"
+    ) -> dict:
+        """Fast path of get_products_page - plain dicts built from column rows"""
+        after = decode_cursor(cursor, sort_by, order) if cursor else None
+        rows = self.repository.get_page(limit, sort_by, order, after, as_rows=True)
+        return self._page_payload(rows, limit, sort_by, order)
     
     def get_product_by_id(self, product_id: UUID) -> Optional[ProductResponse]:
-        """Get a specific product by UUID"""
-        product = self.repository.get_by_id(product_id)
-        if product:
-            return ProductResponse.model_validate(product)
-        return None
+        """Get a specific product by UUID - served from product_cache when possible"""
+        key = str(product_id)
+        cached, lease = self._cached_product(key)
+        if cached is not None:
+            return cached
+        return self._read_product(key, lease, self.repository.get_by_id(product_id))
     
     def create_product(self, product_data: ProductCreate) -> ProductResponse:
         """Create a new product"""
         product = self.repository.create(product_data)
+        self._written()
         return ProductResponse.model_validate(product)
     
     def update_product(self, product_id: UUID, product_data: ProductUpdate) -> Optional[ProductResponse]:
         """Update an existing product"""
         product = self.repository.update(product_id, product_data)
+        self._written([product_id])
         if product:
             return ProductResponse.model_validate(product)
         return None
     
     def delete_product(self, product_id: UUID) -> bool:
         """Delete a product"""
-        return self.repository.delete(product_id)
+        deleted = self.repository.delete(product_id)
+        self._written([product_id])
+        return deleted
+    
+    def bulk_create_products(self, products_data: List[ProductCreate]) -> BulkOperationResponse:
+        """Create many products, reporting per-item errors"""
+        products, errors = self.repository.bulk_create(products_data)
+        self._written()
+        return self._bulk_response(products, errors)
+    
+    def bulk_update_products(self, products_data: List[ProductBulkUpdate]) -> BulkOperationResponse:
+        """Update many products, reporting per-item errors"""
+        products, errors = self.repository.bulk_update(products_data)
+        self._written(item.id for item in products_data)
+        return self._bulk_response(products, errors)
+    
+    def bulk_delete_products(self, product_ids: List[UUID]) -> BulkOperationResponse:
+        """Delete many products, reporting per-item errors"""
+        deleted_ids, errors = self.repository.bulk_delete(product_ids)
+        self._written(deleted_ids)
+        return self._bulk_delete_response(deleted_ids, errors)
+    
+    def adjust_stock(self, adjustments: List[ProductStockAdjustment], atomic: bool = True) -> StockAdjustmentResponse:
+        """Apply stock deltas with conditional UPDATEs, reporting per-item errors"""
+        products, errors = self.repository.adjust_stock(adjustments, atomic)
+        self._written(product.id for product in products)
+        return self._stock_response(products, errors)
+    
+    def get_changes(self, since: int, limit: int) -> Optional[ProductChangesResponse]:
+        """
+        Product changes after seq `since`, oldest first
+        
+        Returns None when compaction has removed tombstones past `since`, so the
+        client has to resync from since=0. The horizon is read after the entries,
+        so a compaction running in between is noticed too.
+        """
+        changes = self.repository.get_changes(since, limit)
+        return self._changes_response(since, changes, self.repository.get_change_horizon())
+    
+    def compact_change_log(self, tombstone_retention_seconds: Optional[int] = None) -> ChangeLogCompactionResponse:
+        """Remove superseded change log entries and tombstones past the retention (default: the configured one)"""
+        if tombstone_retention_seconds is None:
+            tombstone_retention_seconds = settings.change_log_tombstone_retention_seconds
+        superseded, tombstones, compacted_through = self.repository.compact_changes(tombstone_retention_seconds)
+        return ChangeLogCompactionResponse(superseded=superseded, tombstones=tombstones, compacted_through=compacted_through)
     
     def product_exists(self, product_id: UUID) -> bool:
         """Check if a product exists"""
         return self.repository.get_by_id(product_id) is not None
+
+
+def main():
+    """python -m app.services.product_service compact"""
+    parser = argparse.ArgumentParser(description="Maintain the product change log")
+    parser.add_argument("command", choices=("compact",))
+    parser.add_argument(
+        "--tombstone-retention",
+        type=int,
+        default=None,
+        help="seconds to keep tombstones for (default CHANGE_LOG_TOMBSTONE_RETENTION_SECONDS, 0 keeps them)"
+    )
+    args = parser.parse_args()
+    
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        print(ProductService(db).compact_change_log(args.tombstone_retention).model_dump_json(indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
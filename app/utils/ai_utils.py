@@ -1,60 +1,80 @@
-from app.config.ai_config import ai_client
-import json
+from app.config.ai_config import get_ai_client, get_async_ai_client
+from app.config.settings import settings
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+from app.core.metrics import llm_early_closes_total, llm_failures_total, llm_request_duration, llm_tokens_total, metrics
 from app.models.schemas import ProductFilters
+from app.utils.json_stream import StreamedJSON, extract_json_objects
+
+logger = logging.getLogger(__name__)
+
+FILTER_FIELDS = frozenset(ProductFilters.model_fields)
+
+
+def accept_filters(obj: dict) -> ProductFilters:
+    """ProductFilters from a JSON object that names at least one filter field - a streamed call stops at the first one"""
+    if not FILTER_FIELDS.intersection(obj):
+        raise ValueError("JSON object has none of the filter fields")
+    return ProductFilters.model_validate(obj)
 
 class AIUtils:
-    def __init__(self, client=ai_client, model="openai/gpt-oss-120b"):
-        self.client = client
+    def __init__(
+        self,
+        client=None,
+        model="openai/gpt-oss-120b",
+        async_client=None,
+        max_concurrency: int = settings.ai_max_concurrency
+    ):
+        # None means the shared configured clients, resolved on first call
+        self._client = client
+        self._async_client = async_client
         self.model = model
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
 
-    def clean_llm_json(self, raw_response: str):
-        # Work with a copy to avoid modifying the original argument
-        response = raw_response
-        
-        # Remove markdown wrapper if present
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.endswith('```'):
-            response = response[:-3]
-        
-        # Remove any explanations after the JSON
-        response = response.strip()
-        
-        # Find all JSON objects in the response
-        json_objects = []
-        start = 0
-        
-        while True:
-            first_brace = response.find('{', start)
-            if first_brace == -1:
-                break
-                
-            # Find matching closing brace
-            brace_count = 0
-            last_brace = -1
-            
-            for i in range(first_brace, len(response)):
-                if response[i] == '{':
-                    brace_count += 1
-                elif response[i] == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        last_brace = i
-                        break
-            
-            if last_brace != -1 and last_brace > first_brace:
-                json_str = response[first_brace:last_brace + 1]
-                try:
-                    json_obj = json.loads(json_str)
-                    json_objects.append(json_obj)
-                except json.JSONDecodeError:
-                    pass  # Skip invalid JSON
-                start = last_brace + 1
-            else:
-                break
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Bounds concurrent upstream calls made through async_llm_stream_json
         
+        Created on first use in the running loop, and again in a new one - an
+        asyncio.Semaphore must not be shared by event loops (tests, reloads).
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_ai_client()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = get_async_ai_client()
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, async_client):
+        self._async_client = async_client
+
+    def clean_llm_json(self, raw_response: str):
+        """Merge every top-level JSON object of a complete response into one dict"""
+        json_objects = extract_json_objects(raw_response)
         if not json_objects:
-            print(f"Raw AI response with no valid JSON: {raw_response}")
+            # Length only - the response echoes the user's query
+            logger.warning("AI response with no valid JSON (%d chars)", len(raw_response))
             raise ValueError("No valid JSON found in response")
         
         # Merge all JSON objects
@@ -64,48 +84,143 @@ class AIUtils:
         
         return merged_result
 
-    def llm_call(self, prompt: str, temperature: float = 0.0) -> str:
-        """Simple LLM call function using the configured AI client."""
+    def classify_llm_error(self, e: Exception) -> str:
+        """Failure class of an LLM call: api, connection, timeout, parse or other"""
+        if "openai" in str(type(e)).lower() or "api" in str(e).lower():
+            return "api"
+        elif "connection" in str(e).lower():
+            return "connection"
+        elif "timeout" in str(e).lower():
+            return "timeout"
+        elif "json" in str(e).lower():
+            return "parse"
+        return "other"
+
+    def raise_llm_error(self, e: Exception):
+        """Re-raise an LLM call failure classified by its cause"""
+        # Handle different types of errors appropriately
+        error_class = self.classify_llm_error(e)
+        if error_class == "api":
+            # OpenAI API errors
+            raise Exception(f"AI API error: {str(e)}")
+        elif error_class == "connection":
+            # Connection errors
+            raise Exception(f"AI service connection error: {str(e)}")
+        elif error_class == "timeout":
+            # Timeout errors
+            raise Exception(f"AI service timeout error: {str(e)}")
+        elif error_class == "parse":
+            # JSON parsing errors
+            raise Exception(f"AI response parsing error: {str(e)}")
+        else:
+            # General errors
+            raise Exception(f"AI LLM call failed: {str(e)}")
+
+    def record_llm_call(self, started: float, usage=None, error: Exception = None):
+        """Record latency, token usage and failure class of one upstream call"""
+        if not metrics.enabled:
+            return
+        if error is not None:
+            error_class = self.classify_llm_error(error)
+            llm_request_duration.observe((error_class,), time.perf_counter() - started)
+            llm_failures_total.inc((error_class,))
+            return
+        llm_request_duration.observe(("success",), time.perf_counter() - started)
+        if usage is not None:
+            llm_tokens_total.inc(("prompt",), usage.prompt_tokens or 0)
+            llm_tokens_total.inc(("completion",), usage.completion_tokens or 0)
+
+    def stream_request(self, prompt: str, temperature: float) -> dict:
+        """Arguments of a streamed chat completion - usage comes in the last chunk"""
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+
+    @staticmethod
+    def chunk_text(chunk) -> str:
+        """Text delta of one streamed completion chunk"""
+        if not chunk.choices or chunk.choices[0].delta is None:
+            return ""
+        return chunk.choices[0].delta.content or ""
+
+    def llm_stream_json(
+        self,
+        prompt: str,
+        accept: Callable[[dict], Any],
+        finalize: Callable[[dict], Any],
+        temperature: float = 0.0
+    ):
+        """
+        Streamed LLM call that stops reading once a JSON object is accepted
+        
+        The completion is fed to a StreamedJSON as it arrives and the stream is
+        closed at the first object `accept` takes, so whatever the model writes
+        after its JSON is neither waited for nor generated. If the stream ends
+        first, the merged objects go to `finalize`.
+        """
+        started = time.perf_counter()
+        reader = StreamedJSON(accept, finalize)
+        usage, closed_early = None, False
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature
-            )
-            
-            if not response.choices or not response.choices[0].message:
-                raise ValueError("Empty response from AI model")
-                
-            raw_content = response.choices[0].message.content.strip()
-            if not raw_content:
-                raise ValueError("Empty content in AI response")
-                
-            # print("Raw content:", raw_content,"\n\n")
-            clean_filters = self.clean_llm_json(raw_content)
-            # print("Raw content:", raw_content, clean_filters,"\n\n")
-            return clean_filters
-            
+            stream = self.client.chat.completions.create(**self.stream_request(prompt, temperature))
+            try:
+                for chunk in stream:
+                    usage = getattr(chunk, "usage", None) or usage
+                    if reader.feed(self.chunk_text(chunk)):
+                        closed_early = True
+                        break
+            finally:
+                stream.close()
+            result = reader.result()
         except Exception as e:
-            # Handle different types of errors appropriately
-            error_msg = f"AI LLM call failed: {str(e)}"
-            if "openai" in str(type(e)).lower() or "api" in str(e).lower():
-                # OpenAI API errors
-                raise Exception(f"AI API error: {str(e)}")
-            elif "connection" in str(e).lower():
-                # Connection errors
-                raise Exception(f"AI service connection error: {str(e)}")
-            elif "timeout" in str(e).lower():
-                # Timeout errors
-                raise Exception(f"AI service timeout error: {str(e)}")
-            elif "json" in str(e).lower():
-                # JSON parsing errors
-                raise Exception(f"AI response parsing error: {str(e)}")
-            else:
-                # General errors
-                raise Exception(error_msg)
+            self.record_llm_call(started, error=e)
+            self.raise_llm_error(e)
+        self.record_stream(started, usage, closed_early)
+        return result
 
-    def llm_to_filter(self, user_query: str) -> ProductFilters:
-        prompt = f"""You are a precise Data Extraction Engine for e-commerce website. Transform natural language queries into a JSON Filter Schema. Convert this user query to JSON filters.
+    async def async_llm_stream_json(
+        self,
+        prompt: str,
+        accept: Callable[[dict], Any],
+        finalize: Callable[[dict], Any],
+        temperature: float = 0.0
+    ):
+        """Non-blocking llm_stream_json - the concurrency slot is held until the stream is closed"""
+        started = time.perf_counter()
+        reader = StreamedJSON(accept, finalize)
+        usage, closed_early = None, False
+        try:
+            async with self.semaphore:
+                # Timed from the acquired slot, so queueing on the semaphore is not counted as LLM latency
+                started = time.perf_counter()
+                stream = await self.async_client.chat.completions.create(**self.stream_request(prompt, temperature))
+                try:
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if reader.feed(self.chunk_text(chunk)):
+                            closed_early = True
+                            break
+                finally:
+                    await stream.close()
+            result = reader.result()
+        except Exception as e:
+            self.record_llm_call(started, error=e)
+            self.raise_llm_error(e)
+        self.record_stream(started, usage, closed_early)
+        return result
+
+    def record_stream(self, started: float, usage, closed_early: bool):
+        """record_llm_call for a streamed call - one closed early has no usage chunk, so it is counted instead"""
+        self.record_llm_call(started, usage)
+        if closed_early and metrics.enabled:
+            llm_early_closes_total.inc()
+
+    def filter_prompt(self, user_query: str) -> str:
+        return f"""You are a precise Data Extraction Engine for e-commerce website. Transform natural language queries into a JSON Filter Schema. Convert this user query to JSON filters.
 
         Schema: {{
         "name": {{"contains": ["string"]}},
@@ -126,6 +241,9 @@ class AIUtils:
 
         Return ONLY JSON with the schema provided above. No explanation.
         """
-        
-        content = self.llm_call(prompt, temperature=0.0)
-        return ProductFilters.model_validate(content)
+
+    def llm_to_filter(self, user_query: str) -> ProductFilters:
+        return self.llm_stream_json(self.filter_prompt(user_query), accept_filters, ProductFilters.model_validate)
+
+    async def async_llm_to_filter(self, user_query: str) -> ProductFilters:
+        return await self.async_llm_stream_json(self.filter_prompt(user_query), accept_filters, ProductFilters.model_validate)
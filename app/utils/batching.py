@@ -0,0 +1,9 @@
+from typing import Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Tuple[int, List[T]]]:
+    """Yield (offset, chunk) pairs of at most `size` items"""
+    for offset in range(0, len(items), size):
+        yield offset, list(items[offset:offset + size])
@@ -0,0 +1,30 @@
+import json
+from typing import Any, Iterable, List
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional - the stdlib encoder is used without it
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes with orjson when installed (it handles UUIDs natively)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through `dumps` - the content is not validated again"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def product_rows_to_dicts(rows: Iterable) -> List[dict]:
+    """Turn trusted (id, name, price, description, quantity) rows into ProductResponse-shaped dicts"""
+    return [
+        {"id": row[0], "name": row[1], "price": row[2], "description": row[3], "quantity": row[4]}
+        for row in rows
+    ]
@@ -0,0 +1,156 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.models.schemas import ProductFilters
+
+
+def normalize_query(user_query: str) -> str:
+    """
+    Fold a natural language query into a cache key
+
+    Lowercases, drops punctuation (decimal points inside numbers are kept) and
+    collapses whitespace, so "Laptops under $500!" and "laptops  under 500" share a key.
+    """
+    text = user_query.lower()
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    text = re.sub(r"[^\w\s.]|_", " ", text)
+    return " ".join(text.split())
+
+
+class FilterCache:
+    """
+    Two tier cache of natural language query -> validated ProductFilters
+
+    The memory tier is an LRU bounded by `max_entries`. When `path` is set, a SQLite
+    file backs it so translations survive restarts; it is bounded by `disk_max_entries`
+    and evicts least recently used rows. Entries older than `ttl_seconds` are
+    treated as misses in both tiers (0 disables expiry).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        path: Optional[str] = None,
+        disk_max_entries: int = 10000
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.disk_max_entries = disk_max_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier on first use"""
+        if not self.path:
+            return None
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS filter_cache ("
+                "key TEXT PRIMARY KEY, filters TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_filter_cache_last_used ON filter_cache (last_used)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _remember(self, key: str, filters: ProductFilters, created_at: float):
+        """Insert into the memory tier, evicting the least recently used entry when full"""
+        self._memory[key] = (filters, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, user_query: str) -> Optional[ProductFilters]:
+        """Return cached filters for the query, or None on a miss"""
+        key = normalize_query(user_query)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                filters, created_at = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return filters
+                del self._memory[key]
+
+            disk = self._disk()
+            if disk is not None:
+                row = disk.execute(
+                    "SELECT filters, created_at FROM filter_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1]):
+                        filters = ProductFilters.model_validate_json(row[0])
+                        disk.execute("UPDATE filter_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                        disk.commit()
+                        self._remember(key, filters, row[1])
+                        self.disk_hits += 1
+                        return filters
+                    disk.execute("DELETE FROM filter_cache WHERE key = ?", (key,))
+                    disk.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, user_query: str, filters: ProductFilters):
+        """Store validated filters for the query in every tier"""
+        key = normalize_query(user_query)
+        now = time.time()
+        with self._lock:
+            self._remember(key, filters, now)
+
+            disk = self._disk()
+            if disk is not None:
+                disk.execute(
+                    "INSERT OR REPLACE INTO filter_cache (key, filters, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, filters.model_dump_json(exclude_none=True), now, now)
+                )
+                overflow = disk.execute("SELECT COUNT(*) FROM filter_cache").fetchone()[0] - self.disk_max_entries
+                if overflow > 0:
+                    disk.execute(
+                        "DELETE FROM filter_cache WHERE key IN "
+                        "(SELECT key FROM filter_cache ORDER BY last_used LIMIT ?)",
+                        (overflow,)
+                    )
+                    self.evictions += overflow
+                disk.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            disk = self._disk()
+            if disk is not None:
+                disk.execute("DELETE FROM filter_cache")
+                disk.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current sizes"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+
+
+def make_etag(version: int, *parts) -> str:
+    """Strong ETag for the representation identified by `parts` at catalog `version`"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'"v{version}-{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def if_none_match_tags(request: Request) -> Optional[list]:
+    """Entity tags of If-None-Match with any W/ prefix removed, or None when the header is absent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+    # Weak comparison - a W/ prefix added by an intermediary still matches
+    return [tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip() for tag in if_none_match.split(",")]
+
+
+def matches_any(request: Request) -> bool:
+    """
+    True for If-None-Match: * - it matches only if the resource exists, so an
+    item route must look the item up before evaluating the conditional request
+    """
+    return "*" in (if_none_match_tags(request) or [])
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators
+    
+    If-None-Match takes precedence; If-Modified-Since is only consulted when it
+    is absent, as RFC 9110 requires.
+    """
+    candidates = if_none_match_tags(request)
+    if candidates is not None:
+        return "*" in candidates or etag in candidates
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
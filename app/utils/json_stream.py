@@ -0,0 +1,131 @@
+import json
+import re
+from typing import Any, Callable, List, Optional
+
+# Characters that change the scanner state inside an object, outside strings
+_STRUCTURE = re.compile(r'[{}"]')
+# The rest of a string body up to its closing quote, escapes included (a trailing backslash is left over)
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')
+# How a JSON object starts - brace spans like {placeholder} fail this without the cost of a JSONDecodeError
+_OBJECT_START = re.compile(r'\{\s*["}]')
+
+
+class JSONObjectExtractor:
+    """
+    Single-pass extractor of the top-level JSON objects in LLM output
+
+    feed() takes the text as it arrives - chunks may split it anywhere, even
+    inside a string or an escape - and returns the objects that chunk
+    completed. Text is never rescanned: regex searches jump from one brace or
+    quote to the next and consume a string body in one match, so prose,
+    markdown fences and long string values are skipped at C speed, and braces
+    inside strings do not count. Text outside objects is ignored, and a
+    balanced span that is not valid JSON is dropped.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False  # the last chunk ended on a backslash inside a string
+        self._parts: List[str] = []  # earlier chunks of the object being read
+
+    def feed(self, chunk: str) -> List[dict]:
+        found = []
+        if not chunk:
+            return found
+        position, size = 0, len(chunk)
+        start = 0 if self.depth else None
+        if self.escaped:
+            self.escaped = False
+            position = 1
+
+        while position < size:
+            if not self.depth:
+                position = chunk.find("{", position)
+                if position == -1:
+                    break
+                self.depth, start = 1, position
+                position += 1
+            elif self.in_string:
+                position = _STRING_BODY.match(chunk, position).end()
+                if position == size:
+                    break
+                if chunk[position] == '"':
+                    self.in_string = False
+                else:  # a backslash ending the chunk escapes the first character of the next one
+                    self.escaped = True
+                position += 1
+            else:
+                match = _STRUCTURE.search(chunk, position)
+                if match is None:
+                    break
+                position = match.end()
+                char = match.group()
+                if char == '"':
+                    self.in_string = True
+                elif char == "{":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if not self.depth:
+                        text = "".join(self._parts) + chunk[start:position] if self._parts else chunk[start:position]
+                        self._parts.clear()
+                        start = None
+                        if not _OBJECT_START.match(text):
+                            continue
+                        try:
+                            value = json.loads(text)
+                        except json.JSONDecodeError:
+                            continue
+                        if isinstance(value, dict):
+                            found.append(value)
+
+        if self.depth:
+            self._parts.append(chunk[start:])
+        return found
+
+
+def extract_json_objects(text: str) -> List[dict]:
+    """Every top-level JSON object in a complete text, in order"""
+    return JSONObjectExtractor().feed(text)
+
+
+class StreamedJSON:
+    """
+    Reads a streamed completion until it yields an acceptable JSON object
+
+    feed() returns True as soon as `accept` takes an object (it raises
+    ValueError - or a pydantic ValidationError - for one it does not), so the
+    caller can close the stream there. If the stream ends first, result()
+    merges every object seen and hands that to `finalize`, which is what
+    clean_llm_json does with a complete response.
+    """
+
+    def __init__(self, accept: Callable[[dict], Any], finalize: Callable[[dict], Any]):
+        self.accept = accept
+        self.finalize = finalize
+        self.extractor = JSONObjectExtractor()
+        self.objects: List[dict] = []
+        self.accepted = False
+        self.value: Optional[Any] = None
+
+    def feed(self, text: str) -> bool:
+        for value in self.extractor.feed(text):
+            self.objects.append(value)
+            try:
+                self.value = self.accept(value)
+            except ValueError:
+                continue
+            self.accepted = True
+            return True
+        return False
+
+    def result(self) -> Any:
+        if self.accepted:
+            return self.value
+        if not self.objects:
+            raise ValueError("No valid JSON found in response")
+        merged = {}
+        for value in self.objects:
+            merged.update(value)
+        return self.finalize(merged)
@@ -0,0 +1,51 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+from uuid import UUID
+
+# Columns a product list can be ordered by - each has a matching (column, id) index
+SORTABLE_FIELDS = ("name", "price", "quantity")
+
+# JSON types a cursor's sort value may have for each sort column (None for a NULL key)
+SORT_VALUE_TYPES = {"name": (str,), "price": (int, float), "quantity": (int,)}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_by: str, order: str, sort_value: Any, product_id: UUID) -> str:
+    """Build an opaque cursor pointing just after the given (sort_value, id) position"""
+    payload = json.dumps([sort_by, order, sort_value, str(product_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> Tuple[Any, UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed, was issued for another sort or
+            its sort value does not fit the sort column
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, sort_value, product_id = json.loads(base64.urlsafe_b64decode(padded))
+        product_id = UUID(product_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    
+    if cursor_sort_by != sort_by or cursor_order != order:
+        raise ValueError("Cursor was issued for a different sort order")
+    if sort_value is not None and (
+        isinstance(sort_value, bool) or not isinstance(sort_value, SORT_VALUE_TYPES[sort_by])
+    ):
+        raise ValueError(f"Invalid cursor: {sort_by} value {sort_value!r} has the wrong type")
+    return sort_value, product_id
+
+
+def page_cursor(items: list, limit: int, sort_by: str, order: str) -> Optional[str]:
+    """Return the cursor for the next page, or None when `items` (fetched with limit + 1) is the last page"""
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor(sort_by, order, getattr(last, sort_by), last.id)
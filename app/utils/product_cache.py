@@ -0,0 +1,153 @@
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface for the product read-through cache
+
+    Values are serialized bytes, so a shared out-of-process store (Redis,
+    memcached, ...) can implement the same methods and be plugged in via
+    build_cache_backend without touching the service layer.
+
+    A read-through fill takes a lease before reading the database and passes
+    it to set. delete revokes the key's lease, so a value read before a write
+    cannot be stored after that write's invalidation (memcached leases, or a
+    version key checked in a Redis transaction, do the same out of process).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None on a miss"""
+
+    def lease(self, key: str) -> Optional[int]:
+        """Token a fill of `key` must pass to set - None when the backend does not check fills"""
+        return None
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, lease: Optional[int] = None):
+        """Store a value - a fill whose lease was revoked by delete / clear is dropped"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Invalidate a single key"""
+
+    @abstractmethod
+    def clear(self):
+        """Invalidate every key"""
+
+    def stats(self) -> Dict[str, float]:
+        return {}
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU bounded by max_entries, with per-entry TTL (0 disables expiry)"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Outstanding fill leases, oldest first - bounded like the entries, a dropped lease only skips its fill
+        self._leases: "OrderedDict[str, int]" = OrderedDict()
+        self._lease_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_fills = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if not expires_at or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def lease(self, key: str) -> Optional[int]:
+        with self._lock:
+            token = self._leases[key] = next(self._lease_ids)
+            self._leases.move_to_end(key)
+            while len(self._leases) > self.max_entries:
+                self._leases.popitem(last=False)
+            return token
+
+    def set(self, key: str, value: bytes, lease: Optional[int] = None):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0
+        with self._lock:
+            if lease is not None:
+                if self._leases.get(key) != lease:
+                    # Invalidated (or leased again) since this fill read the database
+                    self.stale_fills += 1
+                    return
+                del self._leases[key]
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._leases.pop(key, None)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._leases.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_fills": self.stale_fills,
+            "entries": len(self._entries),
+        }
+
+
+class NullCacheBackend(CacheBackend):
+    """Backend used when the cache is disabled - every lookup misses"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, lease: Optional[int] = None):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        return {"backend": "disabled"}
+
+
+def build_cache_backend(name: str, max_entries: int, ttl_seconds: float) -> CacheBackend:
+    """Create the cache backend named in settings"""
+    if name == "memory":
+        return LRUCacheBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if name == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown product cache backend '{name}'")
@@ -0,0 +1,144 @@
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+from app.models.schemas import NumericFilter, ProductFilter, ProductFilters
+
+NUMBER = r"\$?\s*(\d+(?:\.\d+)?)"
+
+# (pattern, bound) - bound says which NumericFilter fields the captured numbers fill
+COMPARATIVE_PATTERNS = [
+    (re.compile(rf"\b(?:between|from)\s+{NUMBER}\s+(?:and|to)\s+{NUMBER}"), "range"),
+    (re.compile(rf"{NUMBER}\s*(?:-|to)\s*{NUMBER}"), "range"),
+    (re.compile(rf"(?:\b(?:under|below|less than|fewer than|cheaper than|lower than|at most|up to|max|maximum)\b|<=?)\s*{NUMBER}"), "lt"),
+    (re.compile(rf"(?:\b(?:over|above|more than|greater than|higher than|at least|min|minimum)\b|>=?)\s*{NUMBER}"), "gt"),
+]
+
+# Words around a number that make it a stock quantity rather than a price
+QUANTITY_CUE = re.compile(r"\s*(?:units?|items?|pieces?|pcs|qty|in stock|left|available|in inventory)\b")
+QUANTITY_PREFIX = re.compile(r"\b(?:quantity|stock|qty|inventory)\s*(?:of|is|with)?\s*$")
+
+FILLER_WORDS = {
+    "a", "an", "the", "and", "with", "that", "are", "is", "for", "in", "of", "to", "at", "on", "me", "i",
+    "show", "find", "get", "list", "search", "want", "need", "looking", "give", "all", "any", "some",
+    "products", "product", "items", "item", "things", "stuff", "which", "what", "have", "has",
+    "price", "priced", "cost", "costs", "costing", "dollars", "dollar", "usd", "bucks",
+    "stock", "quantity", "qty", "units", "unit", "pieces", "available", "left", "inventory",
+}
+
+# Words the rule parser cannot express faithfully - the LLM handles these queries
+COMPLEX_WORDS = {
+    "not", "no", "without", "except", "excluding", "out", "or", "cheap", "cheapest", "expensive",
+    "best", "top", "popular", "similar", "like", "around", "about", "approximately", "roughly",
+    "near", "new", "latest", "sale", "discount", "good", "high", "low", "most", "least",
+}
+
+MAX_KEYWORDS = 3
+
+# Keyword tokens - \w keeps accented and non-Latin letters (café, écran, 日本)
+TOKEN = re.compile(r"[\w$.']+")
+# Characters left over that neither a token nor plain punctuation accounts for (&, +, /, #, emoji, ...)
+UNHANDLED = re.compile(r"[^\w\s$.'\"!?:;()\-]")
+
+
+class ParsedQuery(NamedTuple):
+    filters: Optional[ProductFilters]
+    confidence: float
+
+
+def _keyword_variants(word: str) -> List[str]:
+    """The word plus a naive singular form so ILIKE matches both"""
+    variants = [word]
+    if word.endswith("ies") and len(word) > 4:
+        variants.append(word[:-3] + "y")
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        variants.append(word[:-1])
+    return variants
+
+
+class QueryParser:
+    """
+    Deterministic parser for simple product searches
+
+    Turns numeric comparatives on price/quantity ("under $50", "more than 10 in stock",
+    "price between 20 and 100") and bare keywords into ProductFilters with the same
+    shape the LLM produces. Anything it cannot account for lowers the confidence so
+    the caller can fall back to the LLM. Keeps hit/miss counters for the fast path.
+    """
+
+    def __init__(self, min_confidence: float = 0.8):
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def parse(self, user_query: str) -> ParsedQuery:
+        text = " " + user_query.lower().replace(",", " ") + " "
+        price = {}
+        quantity = {}
+
+        for pattern, bound in COMPARATIVE_PATTERNS:
+            for match in list(pattern.finditer(text)):
+                start, end = match.span()
+                cue = QUANTITY_CUE.match(text, end)
+                is_quantity = bool(cue) or bool(QUANTITY_PREFIX.search(text, 0, start))
+                target = quantity if is_quantity else price
+                numbers = [float(value) for value in match.groups()]
+
+                if bound == "range":
+                    target["gt"], target["lt"] = min(numbers), max(numbers)
+                else:
+                    target[bound] = numbers[0]
+
+                if cue:
+                    end = cue.end()
+                # Blank out the consumed span so later patterns and keyword extraction skip it
+                text = text[:start] + " " * (end - start) + text[end:]
+
+        confidence = 1.0
+        keywords = []
+        if UNHANDLED.search(text):
+            # Dropping these could change what the query means
+            confidence = 0.5
+        for token in TOKEN.findall(text):
+            token = token.strip(".'$")
+            if not token or token in FILLER_WORDS:
+                continue
+            if token in COMPLEX_WORDS:
+                confidence = 0.0
+            elif re.fullmatch(r"\d+(?:\.\d+)?", token):
+                # A number we could not attach to price or quantity
+                confidence = min(confidence, 0.3)
+            elif len(token) > 1:
+                keywords.append(token)
+
+        if len(keywords) > MAX_KEYWORDS:
+            confidence = min(confidence, 0.5)
+        if not keywords and not price and not quantity:
+            confidence = 0.0
+
+        contains = [variant for keyword in keywords for variant in _keyword_variants(keyword)]
+        filters = ProductFilters(
+            name=ProductFilter(contains=contains) if contains else None,
+            description=ProductFilter(contains=list(contains)) if contains else None,
+            price=NumericFilter(**price) if price else None,
+            quantity=NumericFilter(**quantity) if quantity else None
+        )
+        return ParsedQuery(filters=filters, confidence=confidence)
+
+    def try_parse(self, user_query: str) -> Optional[ProductFilters]:
+        """Return filters when the parse is confident enough, otherwise None (counted as a miss)"""
+        parsed = self.parse(user_query)
+        with self._lock:
+            if parsed.confidence >= self.min_confidence:
+                self.hits += 1
+                return parsed.filters
+            self.misses += 1
+            return None
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "fast_path_hits": self.hits,
+            "fast_path_misses": self.misses,
+            "fast_path_hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,195 @@
+"""
+Correctness and speed of the LLM JSON extraction
+
+Checks every case of benchmarks/data/llm_filter_outputs.jsonl - model outputs
+with fences, prose, braces and escaped quotes inside strings, echoed schemas,
+several objects, truncation - by feeding it to the streamed filter reader in
+random chunk splits (and one character at a time) and comparing the filters it
+settles on with the expected ones. Any mismatch makes the exit status 1.
+
+Then times the brace-counting clean_llm_json this replaced against the
+incremental extractor on the corpus and on long synthetic outputs, whole and
+in token-sized chunks, and reports how much of each output the stream reads
+before it can be closed.
+
+Usage:
+    python benchmarks/json_extractor.py --splits 50 --repeat 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = os.path.join(ROOT, "benchmarks", "data", "llm_filter_outputs.jsonl")
+
+
+def legacy_clean_llm_json(raw_response: str) -> dict:
+    """The previous AIUtils.clean_llm_json - braces are counted without regard to strings"""
+    response = raw_response
+    if response.startswith('```json'):
+        response = response[7:]
+    if response.endswith('```'):
+        response = response[:-3]
+    response = response.strip()
+    json_objects = []
+    start = 0
+    while True:
+        first_brace = response.find('{', start)
+        if first_brace == -1:
+            break
+        brace_count = 0
+        last_brace = -1
+        for i in range(first_brace, len(response)):
+            if response[i] == '{':
+                brace_count += 1
+            elif response[i] == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    last_brace = i
+                    break
+        if last_brace != -1 and last_brace > first_brace:
+            try:
+                json_objects.append(json.loads(response[first_brace:last_brace + 1]))
+            except json.JSONDecodeError:
+                pass
+            start = last_brace + 1
+        else:
+            break
+    if not json_objects:
+        raise ValueError("No valid JSON found in response")
+    merged = {}
+    for obj in json_objects:
+        merged.update(obj)
+    return merged
+
+
+def random_chunks(text: str, rng: random.Random, largest: int = 16):
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, largest)
+        yield text[position:position + size]
+        position += size
+
+
+def read_filters(chunks):
+    """Filters the streamed reader settles on, characters read before it could close, or (None, read) on error"""
+    from app.models.schemas import ProductFilters
+    from app.utils.ai_utils import accept_filters
+    from app.utils.json_stream import StreamedJSON
+
+    reader = StreamedJSON(accept_filters, ProductFilters.model_validate)
+    read = 0
+    for chunk in chunks:
+        read += len(chunk)
+        if reader.feed(chunk):
+            break
+    try:
+        return reader.result().model_dump(exclude_none=True), read
+    except ValueError:
+        return None, read
+
+
+def legacy_filters(text: str):
+    from app.models.schemas import ProductFilters
+
+    try:
+        return ProductFilters.model_validate(legacy_clean_llm_json(text)).model_dump(exclude_none=True)
+    except ValueError:
+        return None
+
+
+def check_corpus(cases, splits: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    legacy_wrong = []
+    for case in cases:
+        text, expected = case["output"], case["expected"]
+        variants = [[text], list(text)] + [list(random_chunks(text, rng)) for _ in range(splits)]
+        for chunks in variants:
+            got, _ = read_filters(chunks)
+            if got != expected:
+                failures += 1
+                print(f"MISMATCH {case['name']}: split {[len(c) for c in chunks][:12]}... got {got}, expected {expected}")
+                break
+        if legacy_filters(text) != expected:
+            legacy_wrong.append(case["name"])
+    print(f"corpus: {len(cases)} cases x {splits + 2} splits, {failures} mismatches")
+    print(f"previous clean_llm_json differs on {len(legacy_wrong)}: {', '.join(legacy_wrong) or '-'}")
+    return failures
+
+
+def per_call_us(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def time_parsers(name: str, texts, repeat: int, rng: random.Random):
+    from app.utils.json_stream import JSONObjectExtractor, extract_json_objects
+
+    chunked = [list(random_chunks(text, rng, largest=8)) for text in texts]
+
+    def legacy():
+        for text in texts:
+            try:
+                legacy_clean_llm_json(text)
+            except ValueError:
+                pass
+
+    def whole():
+        for text in texts:
+            extract_json_objects(text)
+
+    def streamed():
+        for chunks in chunked:
+            extractor = JSONObjectExtractor()
+            for chunk in chunks:
+                extractor.feed(chunk)
+
+    size = sum(len(text) for text in texts)
+    print(f"\n{name} ({len(texts)} outputs, {size} chars)")
+    for label, func in (("previous clean_llm_json", legacy), ("extractor, whole text", whole), ("extractor, 1-8 char chunks", streamed)):
+        us = per_call_us(func, repeat)
+        print(f"  {label:28s} {us:10.1f} us   {size / us:8.1f} chars/us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--splits", type=int, default=50, help="random chunk splits checked per corpus case")
+    parser.add_argument("--repeat", type=int, default=200, help="timing iterations")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    os.environ.setdefault("API_KAIEY", "benchmark")
+    sys.path.insert(0, ROOT)
+
+    with open(args.corpus, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    failures = check_corpus(cases, args.splits, args.seed)
+
+    rng = random.Random(args.seed)
+    answer = '```json\n{"name": {"contains": ["desk", "table"]}, "price": {"lt": 250}}\n```'
+    prose = "The user is asking for furniture; {desk} and \"table\" are the keywords, a price cap of 250 applies. " * 100
+    time_parsers("corpus", [case["output"] for case in cases], args.repeat, rng)
+    time_parsers("answer then 10 KB of explanation", [answer + "\n" + prose], args.repeat, rng)
+    time_parsers("10 KB of reasoning then answer", [prose + "\n" + answer], args.repeat, rng)
+    time_parsers("long string value", ['{"description": {"contains": ["' + "x\\\"y{}" * 2000 + '"]}}'], args.repeat, rng)
+
+    print("\nread before the stream can be closed")
+    for label, text in (("corpus", None), ("answer then 10 KB of explanation", answer + "\n" + prose)):
+        texts = [case["output"] for case in cases] if text is None else [text]
+        total = sum(len(t) for t in texts)
+        read = sum(read_filters(random_chunks(t, rng, largest=8))[1] for t in texts)
+        print(f"  {label:34s} {read:7d} of {total:7d} chars ({read / total:6.1%})")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of product list serialization
+
+Compares, on N rows (default 100k), the original path - ORM instances,
+ProductResponse.model_validate per row, response_model validation and
+jsonable_encoder + json.dumps as FastAPI does it - against the fast path:
+column rows, plain dicts and FastJSONResponse. Prints microseconds per row and
+peak traced memory for each.
+
+Usage:
+    python benchmarks/list_serialization.py --rows 100000
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(label, rows, func):
+    # Timed and memory-traced in separate runs - tracemalloc slows allocation heavily
+    gc.collect()
+    started = time.perf_counter()
+    body = func()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {elapsed / rows * 1e6:>8.2f} us/row  peak {peak / 2**20:>8.1f} MiB  body {len(body) / 2**20:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    sys.path.insert(0, ROOT)
+    logging.disable(logging.CRITICAL)
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from app.core.database import SessionLocal, init_db
+    from app.models.schemas import ProductCreate, ProductListResponse
+    from app.repositories.product_repository import ProductRepository
+    from app.services.product_service import ProductService
+    from app.utils.fast_json import FastJSONResponse
+
+    init_db()
+    db = SessionLocal()
+    ProductRepository(db).bulk_create([
+        ProductCreate(name=f"Bench {i}", price=float(i % 500), description="benchmark row", quantity=i % 50)
+        for i in range(args.rows)
+    ])
+    rows = ProductRepository(db).count()
+    response_model = TypeAdapter(ProductListResponse)
+
+    def original():
+        db.expunge_all()
+        result = ProductService(db).get_all_products()
+        # What FastAPI does with response_model before rendering
+        validated = response_model.validate_python(result, from_attributes=True)
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def fast():
+        db.expunge_all()
+        return FastJSONResponse(ProductService(db).get_all_products_payload()).body
+
+    measure("original", rows, original)
+    measure("fast", rows, fast)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
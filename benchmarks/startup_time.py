@@ -0,0 +1,88 @@
+"""
+Cold start benchmark - import time, startup time and time to first response
+
+Launches a fresh interpreter per run against a new SQLite file and measures:
+
+    import          `import main` (module count and whether it touched the database)
+    startup         the lifespan startup handler (schema, seed data, product index)
+    first_request   the first GET /api/v1/products/ through httpx's ASGI transport
+    total           process launch to first response, measured by the parent
+
+Medians over --runs are printed as JSON.
+
+Usage:
+    python benchmarks/startup_time.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import asyncio, json, logging, os, sys, time
+started = time.perf_counter()
+logging.disable(logging.CRITICAL)
+import main
+imported = time.perf_counter()
+result = {
+    "import_s": imported - started,
+    "modules": len(sys.modules),
+    "database_touched_on_import": os.path.exists(os.environ["BENCH_DB_FILE"]),
+}
+
+async def run():
+    import httpx
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        result["startup_s"] = ready - imported
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/api/v1/products/")
+            response.raise_for_status()
+        result["first_request_s"] = time.perf_counter() - ready
+
+asyncio.run(run())
+print(json.dumps(result))
+"""
+
+
+def run_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        env = dict(os.environ)
+        env.update(DATABASE_URL=f"sqlite:///{db_file}", BENCH_DB_FILE=db_file, PYTHONPATH=ROOT)
+        env.setdefault("API_KAIEY", "benchmark")
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        total = time.perf_counter() - started
+    result = json.loads(output.strip().splitlines()[-1])
+    result["total_s"] = total
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "modules": runs[-1]["modules"],
+        "database_touched_on_import": any(run["database_touched_on_import"] for run in runs),
+    }
+    for key in ("import_s", "startup_s", "first_request_s", "total_s"):
+        report[key.replace("_s", "_ms")] = round(statistics.median(run[key] for run in runs) * 1000, 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
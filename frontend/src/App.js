@@ -7,6 +7,7 @@ import ProductForm from "./components/ProductForm";
 import ProductTable from "./components/ProductTable";
 import Footer from "./components/Footer";
 import { productAPI, aiAPI } from "./api/api";
+import { API_URLS } from "./api/urls";
 
 function App() {
   const [products, setProducts] = useState([]);
@@ -36,6 +37,28 @@ function App() {
     fetchProducts();
   }, []);
 
+  // Apply other users' edits as they are pushed instead of refetching the list
+  useEffect(() => {
+    const stream = new EventSource(API_URLS.PRODUCT_STREAM);
+    stream.addEventListener("upsert", (e) => {
+      const { product } = JSON.parse(e.data);
+      setProducts((current) => {
+        const index = current.findIndex((p) => p.id === product.id);
+        if (index === -1) return [...current, product];
+        const next = [...current];
+        next[index] = product;
+        return next;
+      });
+    });
+    stream.addEventListener("delete", (e) => {
+      const { id } = JSON.parse(e.data);
+      setProducts((current) => current.filter((p) => p.id !== id));
+    });
+    // Missed changes were compacted away - reload the list
+    stream.addEventListener("reset", () => fetchProducts());
+    return () => stream.close();
+  }, []);
+
   // Handle sorting
   const handleSort = (field) => {
     if (sortField === field) {
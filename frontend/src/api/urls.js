@@ -8,6 +8,7 @@ export const API_URLS = {
   // Product endpoints
   PRODUCTS: `${API_BASE_URL}/api/v1/products`,
   PRODUCT_BY_ID: (id) => `${API_BASE_URL}/api/v1/products/${id}`,
+  PRODUCT_STREAM: `${API_BASE_URL}/api/v1/products/stream`,
   
   // AI Search endpoint (if exists)
   AI_SEARCH: `${API_BASE_URL}/api/v1/ai/product-search`,
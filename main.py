@@ -1,17 +1,48 @@
 
-from fastapi import FastAPI, Depends
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from app.config.ai_config import ai_client
+from app.config.ai_config import get_ai_client
 from app.config.settings import settings
-from app.core.database import init_db, get_db
+from app.core.database import init_db, init_product_index, get_db, read_replicas, run_change_log_compaction
+from app.core.change_stream import change_broadcaster
+from app.core.db_metrics import RequestDBStats, current_request_stats
+from app.core.metrics import http_request_duration, http_requests_total, metrics
+from app.core.read_replicas import READ_PRIMARY_COOKIE, RequestRouting, current_request_routing
 from app.api.v1.api import api_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize the database when the application starts
+    
+    Runs once per worker at startup rather than at import, so importing main
+    (tests, tooling, pre-fork servers loading the app) does not touch the database.
+    """
+    init_db()
+    init_product_index()
+    tasks = [asyncio.create_task(change_broadcaster.run())]
+    if read_replicas.replicas:
+        tasks.append(asyncio.create_task(read_replicas.run_health_checks()))
+    if settings.change_log_compaction_interval > 0:
+        tasks.append(asyncio.create_task(run_change_log_compaction()))
+    yield
+    for task in tasks:
+        task.cancel()
+
+
 # Initialize the FastAPI application
 app = FastAPI(
     title=settings.app_name,
     description=settings.app_description,
-    version=settings.app_version
+    version=settings.app_version,
+    lifespan=lifespan
 )
 
 # Configure CORS (Cross-Origin Resource Sharing) middleware
@@ -24,11 +55,83 @@ app.add_middleware(
     allow_headers=settings.allowed_headers,
 )
 
+def route_template(request: Request) -> str:
+    """Full path template of the matched route, e.g. /api/v1/products/{product_id}"""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Routes of included routers may only know their own suffix, so keep the
+    # matching number of trailing segments of the real path for the template
+    prefix = request.scope["path"].rsplit("/", route.path.count("/"))[0]
+    return prefix + route.path
+
+# Report per-request database usage and record route latency / status metrics
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """
+    Count the statements and database time spent serving each request
+    
+    The totals are reported back in a Server-Timing header, so slow requests
+    can be told apart as slow queries vs. waiting on something else. Latency
+    and status are recorded per route template (not per raw path) to keep the
+    number of metric series bounded.
+    """
+    started = time.perf_counter()
+    stats = RequestDBStats()
+    token = current_request_stats.set(stats)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        current_request_stats.reset(token)
+        if metrics.enabled:
+            labels = (request.method, route_template(request))
+            http_request_duration.observe(labels, time.perf_counter() - started)
+            http_requests_total.inc(labels + (str(status),))
+    response.headers["Server-Timing"] = f'db;dur={stats.seconds * 1000:.2f};desc="{stats.statements} statements"'
+    return response
+
+# Route a client's reads to the primary for a short window after its own writes
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    Read-your-writes stickiness for read replica routing
+    
+    A request that commits on the primary gets a short-lived cookie; while it
+    is valid, get_read_db sends that client's reads to the primary instead of
+    a replica that may not have replayed the write yet. The cookie rather than
+    in-process state keeps this working across workers.
+    """
+    if not read_replicas.replicas:
+        return await call_next(request)
+    
+    routing = RequestRouting.from_cookie(request.cookies.get(READ_PRIMARY_COOKIE))
+    token = current_request_routing.set(routing)
+    try:
+        response = await call_next(request)
+    finally:
+        current_request_routing.reset(token)
+    if routing.wrote:
+        window = settings.read_your_writes_seconds
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            f"{time.time() + window:.3f}",
+            max_age=math.ceil(window),
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
 # Include API routes
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
-# Initialize the database when the application starts
-init_db()
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus text exposition of request, database and LLM metrics"""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def greet(ai: bool = False, db: Session = Depends(get_db)):
@@ -44,7 +147,7 @@ def greet(ai: bool = False, db: Session = Depends(get_db)):
     """
     if ai:
         try:
-            resp = ai_client.chat.completions.create(
+            resp = get_ai_client().chat.completions.create(
                 model="dolphin-x1-8b",
                 messages=[{"role": "user", "content": "Say hello"}],
                 temperature=0.2